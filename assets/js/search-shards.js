@@ -0,0 +1,236 @@
+// Пошук за попередньо зібраним індексом, розбитим на шарди за розділами (див. search_index.py).
+// Спершу завантажується маніфест і шард поточного розділу; інші шарди - лише тоді,
+// коли їхній фільтр Блума показує, що в них можуть бути всі терми запиту.
+(function () {
+  'use strict';
+
+  var script = document.currentScript;
+  var indexUrl = script.getAttribute('data-index');
+  var baseUrl = script.getAttribute('data-baseurl') || '';
+  var MAX_RESULTS = 10;
+  var DEBOUNCE_MS = 80;
+  var TRIM_RE = /^[^\p{L}\p{N}_]+|[^\p{L}\p{N}_]+$/gu;
+
+  var manifestPromise = null;
+  var shardPromises = {};
+
+  function fetchJson(url) {
+    return fetch(url).then(function (response) {
+      if (!response.ok) throw new Error(url + ': ' + response.status);
+      return response.json();
+    });
+  }
+
+  function decodeBloom(base64) {
+    var binary = atob(base64);
+    var bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return bytes;
+  }
+
+  function loadManifest() {
+    if (!manifestPromise) {
+      manifestPromise = fetchJson(indexUrl + 'manifest.json').then(function (manifest) {
+        manifest.separatorRe = new RegExp(manifest.separator);
+        manifest.shards.forEach(function (shard) { shard.bitmap = decodeBloom(shard.bloom); });
+        return manifest;
+      });
+    }
+    return manifestPromise;
+  }
+
+  function loadShard(shard) {
+    if (!shardPromises[shard.file]) {
+      shardPromises[shard.file] = fetchJson(indexUrl + shard.file);
+    }
+    return shardPromises[shard.file];
+  }
+
+  function tokenize(text, manifest) {
+    return text.toLowerCase().split(manifest.separatorRe)
+      .map(function (token) { return token.replace(TRIM_RE, ''); })
+      .filter(function (token) { return token.length > 0; });
+  }
+
+  // FNV-1a і подвійне хешування - та сама формула, що й bloom_positions у search_index.py
+  function fnv1a(bytes, seed) {
+    var value = seed;
+    for (var i = 0; i < bytes.length; i++) value = Math.imul(value ^ bytes[i], 16777619);
+    return value >>> 0;
+  }
+
+  var encoder = new TextEncoder();
+
+  function mayContain(shard, token, manifest) {
+    var bytes = encoder.encode(token.slice(0, manifest.prefix_chars));
+    var h1 = fnv1a(bytes, 2166136261);
+    var h2 = (fnv1a(bytes, 0x5BD1E995) | 1) >>> 0;
+    for (var i = 0; i < manifest.hashes; i++) {
+      var position = ((h1 + Math.imul(i, h2)) >>> 0) % shard.bits;
+      if (!(shard.bitmap[position >> 3] & (1 << (position & 7)))) return false;
+    }
+    return true;
+  }
+
+  function lowerBound(terms, key) {
+    var low = 0, high = terms.length;
+    while (low < high) {
+      var middle = (low + high) >> 1;
+      if (terms[middle] < key) low = middle + 1; else high = middle;
+    }
+    return low;
+  }
+
+  // Кожен терм запиту шукається як префікс (повний збіг важить удвічі більше); документ має містити всі терми
+  function searchShard(index, tokens) {
+    var scores = null;
+    tokens.forEach(function (token) {
+      var hits = {};
+      for (var i = lowerBound(index.terms, token); i < index.terms.length && index.terms[i].lastIndexOf(token, 0) === 0; i++) {
+        var weight = index.terms[i] === token ? 2 : 1;
+        var postings = index.postings[i];
+        for (var j = 0; j < postings.length; j += 2) {
+          hits[postings[j]] = (hits[postings[j]] || 0) + postings[j + 1] * weight;
+        }
+      }
+      if (scores === null) {
+        scores = hits;
+      } else {
+        Object.keys(scores).forEach(function (doc) {
+          if (hits[doc] === undefined) delete scores[doc]; else scores[doc] += hits[doc];
+        });
+      }
+    });
+    return Object.keys(scores || {}).map(function (doc) {
+      return { doc: index.docs[doc], score: scores[doc] };
+    });
+  }
+
+  function search(query) {
+    return loadManifest().then(function (manifest) {
+      var tokens = tokenize(query, manifest);
+      if (!tokens.length) return [];
+      var shards = manifest.shards.filter(function (shard) {
+        return tokens.every(function (token) { return mayContain(shard, token, manifest); });
+      });
+      return Promise.all(shards.map(function (shard) {
+        return loadShard(shard).then(function (index) {
+          return searchShard(index, tokens).map(function (result) {
+            result.section = shard.title;
+            return result;
+          });
+        });
+      })).then(function (perShard) {
+        var results = [].concat.apply([], perShard);
+        results.sort(function (a, b) { return b.score - a.score; });
+        return results.slice(0, MAX_RESULTS);
+      });
+    });
+  }
+
+  // Шард розділу, в якому відкрито сторінку, завантажується заздалегідь
+  function preloadCurrentSection() {
+    loadManifest().then(function (manifest) {
+      var path = decodeURIComponent(location.pathname.slice(baseUrl.length)).replace(/^\/+/, '');
+      var section = path.split('/')[0];
+      manifest.shards.forEach(function (shard) {
+        if (shard.name === section) loadShard(shard);
+      });
+    });
+  }
+
+  function element(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text) node.textContent = text;
+    return node;
+  }
+
+  function render(container, results) {
+    container.textContent = '';
+    if (!results.length) {
+      container.appendChild(element('p', 'search-no-result', 'Нічого не знайдено'));
+      return;
+    }
+    var list = element('ul', 'search-results-list');
+    results.forEach(function (result) {
+      var link = element('a', 'search-result');
+      link.href = baseUrl + result.doc[0];
+      var title = element('div', 'search-result-title');
+      title.appendChild(element('span', 'search-result-doc', result.doc[1]));
+      link.appendChild(title);
+      var location = [result.section, result.doc[2]].filter(function (part, index, parts) {
+        return part && parts.indexOf(part) === index && part !== result.doc[1];
+      }).join(' / ');
+      if (location) link.appendChild(element('span', 'search-result-rel-url', location));
+      var item = element('li', 'search-results-list-item');
+      item.appendChild(link);
+      list.appendChild(item);
+    });
+    container.appendChild(list);
+  }
+
+  function init() {
+    var input = document.getElementById('search-input');
+    var container = document.getElementById('search-results');
+    if (!input || !container) return;
+    var root = document.documentElement;
+    var timer = null;
+    var requestId = 0;
+
+    function hide() { root.classList.remove('search-active'); }
+
+    input.addEventListener('focus', function () {
+      preloadCurrentSection();
+      if (input.value) root.classList.add('search-active');
+    }, { once: false });
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      if (!input.value.trim()) {
+        hide();
+        container.textContent = '';
+        return;
+      }
+      timer = setTimeout(function () {
+        var current = ++requestId;
+        search(input.value).then(function (results) {
+          if (current !== requestId) return;
+          render(container, results);
+          root.classList.add('search-active');
+        }).catch(function (error) {
+          console.error('Пошук недоступний:', error);
+        });
+      }, DEBOUNCE_MS);
+    });
+
+    input.addEventListener('keydown', function (event) {
+      var links = container.querySelectorAll('.search-result');
+      if (!links.length) return;
+      var active = container.querySelector('.search-result.active');
+      var position = Array.prototype.indexOf.call(links, active);
+      if (event.key === 'ArrowDown' || event.key === 'ArrowUp') {
+        event.preventDefault();
+        if (active) active.classList.remove('active');
+        position = event.key === 'ArrowDown' ? (position + 1) % links.length : (position - 1 + links.length) % links.length;
+        links[position].classList.add('active');
+      } else if (event.key === 'Enter') {
+        event.preventDefault();
+        (active || links[0]).click();
+      } else if (event.key === 'Escape') {
+        input.blur();
+        hide();
+      }
+    });
+
+    document.addEventListener('click', function (event) {
+      if (!event.target.closest('.search')) hide();
+    });
+  }
+
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', init);
+  } else {
+    init();
+  }
+})();
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+from collections.abc import Iterator
+from markdown_files import write_file_atomic
+
+# Файли пакетного завдання (не плутати з requests.jsonl у корені репозиторію)
+DEFAULT_BATCH_REQUESTS_FILE = os.path.join("batch", "requests.jsonl")
+DEFAULT_BATCH_RESPONSES_FILE = os.path.join("batch", "responses.jsonl")
+# Роздільник шляху сторінки та відбитка її вхідних даних у ключі запиту
+KEY_SEPARATOR = "#"
+FINGERPRINT_CHARS = 16
+
+
+def make_key(path: str, fingerprint: str) -> str:
+    """Ключ запиту: шлях сторінки і початок відбитка вхідних даних на момент експорту."""
+    return f"{path}{KEY_SEPARATOR}{fingerprint[:FINGERPRINT_CHARS]}"
+
+
+def split_key(key: str) -> tuple[str, str]:
+    """Повертає (шлях сторінки, відбиток) з ключа запиту."""
+    path, _, fingerprint = key.rpartition(KEY_SEPARATOR)
+    return (path, fingerprint) if path else (key, "")
+
+
+def make_request(key: str, system_prompt: str, user_prompt: str) -> dict:
+    """Рядок вхідного файлу пакетного завдання у форматі Gemini Batch API (GenerateContentRequest з ключем)."""
+    return {
+        "key": key,
+        "request": {
+            "system_instruction": {"parts": [{"text": system_prompt}]},
+            "contents": [{"role": "user", "parts": [{"text": user_prompt}]}],
+        },
+    }
+
+
+def response_text(response: dict) -> str:
+    """Текст першого кандидата з GenerateContentResponse (порожній рядок, якщо кандидатів немає)."""
+    candidates = response.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def write_requests(file_path: str, requests: list[dict]):
+    """Атомарно записує рядки запитів у JSONL-файл."""
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    write_file_atomic(file_path, "".join(json.dumps(request, ensure_ascii=False) + "\n" for request in requests))
+
+
+def read_responses(file_path: str) -> Iterator[tuple[str, str, str | None]]:
+    """
+    Читає JSONL-файл результатів пакетного завдання. Повертає (ключ, текст, помилка)
+    для кожного рядка; для рядків з помилкою або без ключа текст порожній.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                print(f"   - Рядок {line_number}: некоректний JSON ({e}), пропущено.")
+                continue
+            key = item.get("key")
+            if not key:
+                print(f"   - Рядок {line_number}: немає ключа запиту, пропущено.")
+                continue
+            if item.get("error"):
+                error = item["error"]
+                yield key, "", error.get("message", str(error)) if isinstance(error, dict) else str(error)
+                continue
+            yield key, response_text(item.get("response") or {}), None
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Офлайн-бенчмарк конвеєра генерації без звернень до Gemini API.
+
+Для кожного розміру синтетичної структури (кількість тем) скрипт:
+  1. генерує `content.md` і запускає побудову структури (script_create_structure);
+  2. проганяє повний цикл генерації (generate_content) проти імітації API
+     із заданою затримкою, часткою помилок і лімітом запитів (відповіді 429);
+  3. виводить JSON зі швидкістю (сторінок/с), p50/p95 затримки сторінки та піковим RSS.
+
+Приклад:
+    python benchmark.py --sizes 100,1000 --workers 1,8 --latency 0.05 --output bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# config.py друкує повідомлення під час імпорту; stdout лишається чистим для JSON-результатів
+with contextlib.redirect_stdout(sys.stderr):
+    import gemini_service
+    import generate_content
+    from doc_tree import DocTree
+    from generation_manifest import GenerationManifest
+    from llm_backends import LocalProvider, ShardedBackend, Shard
+    from markdown_files import PLACEHOLDER_TEXT
+    from queue_journal import QueueJournal
+    from rate_limiter import RateLimiter
+    from retry_policy import AdaptiveConcurrency, RetryPolicy
+    from script_create_structure import sync_structure
+
+DEFAULT_SIZES = "100,1000,10000"
+DEFAULT_WORKERS = "1,8"
+PROMPT_TYPES = ("section", "overview", "topic", "faq")
+# Скільки підрозділів у розділі і тем у підрозділі має синтетична структура
+SUBSECTIONS_PER_SECTION = 10
+TOPICS_PER_SUBSECTION = 10
+
+
+class FakeApiError(Exception):
+    """Імітація помилки API; code - HTTP-статус (429 або 500)."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeGeminiBackend(LocalProvider):
+    """
+    Локальна імітація Gemini API з налаштовуваною затримкою, часткою помилок 5xx
+    та серверним лімітом запитів на хвилину для кожного ключа (перевищення дає помилку 429).
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.5, error_rate: float = 0.0,
+                 quota_rpm: int = 0, response_chars: int = 2000, seed: int = 0):
+        super().__init__(response_chars)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_rpm = quota_rpm
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: dict[str, deque] = {}
+        self.calls = 0
+        self.errors = {429: 0, 500: 0}
+
+    def before_request(self, api_key: str) -> float:
+        """Рахує виклик і повертає затримку відповіді; викидає FakeApiError для 429/5xx."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            if self.quota_rpm:
+                recent = self._recent.setdefault(api_key, deque())
+                while recent and now - recent[0] > 60:
+                    recent.popleft()
+                if len(recent) >= self.quota_rpm:
+                    self.errors[429] += 1
+                    # Як і справжній API, підказуємо, коли квота звільниться
+                    retry_in = 60 - (now - recent[0])
+                    raise FakeApiError(429, f"Resource has been exhausted (e.g. check quota). Please retry in {retry_in:.1f}s.")
+                recent.append(now)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors[500] += 1
+                raise FakeApiError(500, "An internal error has occurred.")
+            return max(0.0, self.latency * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+
+def synthetic_outline(topics: int) -> list[str]:
+    """Рядки `content.md` з `topics` темами: розділ -> підрозділ -> тема."""
+    lines = ["# Синтетична структура для бенчмарку\n"]
+    created = 0
+    section = 0
+    while created < topics:
+        section += 1
+        lines.append(f"{section} {section} Розділ {section}\n")
+        for sub in range(1, SUBSECTIONS_PER_SECTION + 1):
+            if created >= topics:
+                break
+            lines.append(f"{section}.{sub} {section}.{sub} Підрозділ {section}.{sub}\n")
+            for topic in range(1, min(TOPICS_PER_SUBSECTION, topics - created) + 1):
+                number = f"{section}.{sub}.{topic}"
+                lines.append(f"{number} {number} Тема {number}\n")
+                created += 1
+    return lines
+
+
+def add_qa_pages(root: str = '.') -> int:
+    """Додає qa.md до кожної теми без підрозділів (як у реальній документації)."""
+    tree = DocTree(root)
+    added = 0
+    for node in list(tree.nodes.values()):
+        if node.has_children or node.number is None or os.path.basename(node.path) != 'index.md':
+            continue
+        qa_path = os.path.join(root, os.path.dirname(node.path), 'qa.md')
+        with open(qa_path, 'w', encoding='utf-8') as f:
+            f.write(f"---\nlayout: default\ntitle: {node.title} Q&A\nparent: {node.title}\n---\n\n"
+                    f"{PLACEHOLDER_TEXT}\n")
+        added += 1
+    return added
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    """
+    Піковий RSS поточного процесу в МБ (ru_maxrss: КБ у Linux, байти в macOS).
+    ru_maxrss не зменшується до кінця процесу, тому кожен етап виконується в окремому процесі (run_isolated).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_isolated(function, *args):
+    """
+    Виконує етап бенчмарку в новому процесі (spawn, а не fork - без пам'яті батьківського процесу),
+    щоб пік пам'яті одного етапу не успадковували наступні. Процес стартує в поточному каталозі.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_structure_stage(topics: int) -> dict:
+    """Будує структуру для синтетичного `content.md` у поточному каталозі."""
+    lines = synthetic_outline(topics)
+    with open('content.md', 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        changed = sync_structure(lines)
+    elapsed = time.perf_counter() - started
+    # Повторний запуск без змін у content.md - головний сценарій щоденної роботи
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_structure(lines)
+    noop_elapsed = time.perf_counter() - started
+    pages = sum(1 for path in changed if path.endswith('index.md'))
+    return {
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1) if elapsed else None,
+        "noop_seconds": round(noop_elapsed, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_generation_stage(workers: int, dag: bool, stream: bool, rpm: int, tpm: int,
+                         backend: FakeGeminiBackend, max_attempts: int = 5, batch_size: int = 0, keys: int = 1) -> dict:
+    """Проганяє повний цикл генерації для всіх сторінок дерева в поточному каталозі."""
+    prompts = {name: f"Ти пишеш сторінки типу '{name}' для бенчмарку." for name in PROMPT_TYPES}
+    gemini_service.set_backend(ShardedBackend([
+        Shard(backend, f"bench-key-{index}", gemini_service.MODEL_NAME, RateLimiter(rpm, tpm) if rpm or tpm else None)
+        for index in range(keys)]))
+    gemini_service.set_response_cache(None)
+    gemini_service.set_retry_policy(RetryPolicy(max_attempts))
+    gemini_service.set_concurrency(AdaptiveConcurrency(workers))
+
+    tree = DocTree('.')
+    pages = sorted(node.path for node in tree.nodes.values() if node.number is not None)
+    journal = QueueJournal(os.path.join(os.getcwd(), '.bench_queue.sqlite3'))
+    journal.enqueue(pages)
+    ctx = generate_content.GenerationContext(prompts, tree, GenerationManifest('.bench_manifest.json'), stream=stream)
+
+    latencies = []
+    latencies_lock = threading.Lock()
+    process_file = generate_content.process_file
+    process_batch = generate_content.process_batch
+
+    def timed_process_file(file_path, context):
+        started = time.perf_counter()
+        try:
+            return process_file(file_path, context)
+        finally:
+            with latencies_lock:
+                latencies.append(time.perf_counter() - started)
+
+    def timed_process_batch(file_paths, context):
+        # Затримка пакетного запиту зараховується кожній сторінці пакета
+        started = time.perf_counter()
+        try:
+            return process_batch(file_paths, context)
+        finally:
+            with latencies_lock:
+                latencies.extend([time.perf_counter() - started] * len(file_paths))
+
+    generate_content.process_file = timed_process_file
+    generate_content.process_batch = timed_process_batch
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = generate_content.start_workers(executor, journal, ctx, workers, dag, batch_size)
+            for future in futures:
+                future.result()
+    finally:
+        generate_content.process_file = process_file
+        generate_content.process_batch = process_batch
+    elapsed = time.perf_counter() - started
+
+    counts = journal.counts()
+    journal.close()
+    return {
+        "workers": workers,
+        "dag": dag,
+        "batch": batch_size,
+        "keys": keys,
+        "stream": stream,
+        "pages": len(pages),
+        "done": counts["done"],
+        "failed": counts["failed"],
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(counts["done"] / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "api_calls": backend.calls,
+        "api_errors": {str(code): count for code, count in backend.errors.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_fake_generation_stage(workers: int, args: argparse.Namespace) -> dict:
+    """Етап генерації з новою імітацією API за параметрами командного рядка (для run_isolated)."""
+    backend = FakeGeminiBackend(args.latency, args.jitter, args.error_rate, args.quota_rpm, seed=args.seed)
+    return run_generation_stage(workers, args.dag, args.stream, args.rpm, args.tpm, backend,
+                                args.max_attempts, args.batch, args.keys)
+
+
+def parse_int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк побудови структури та генерації контенту.")
+    parser.add_argument("--sizes", type=parse_int_list, default=parse_int_list(DEFAULT_SIZES),
+                        help=f"Кількість тем у синтетичних структурах (за замовчуванням {DEFAULT_SIZES}).")
+    parser.add_argument("--workers", type=parse_int_list, default=parse_int_list(DEFAULT_WORKERS),
+                        help=f"Кількості потоків генерації для порівняння (за замовчуванням {DEFAULT_WORKERS}).")
+    parser.add_argument("--latency", type=float, default=0.05, help="Середня затримка відповіді API, с.")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Розкид затримки (частка від середньої).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Частка відповідей з помилкою 500.")
+    parser.add_argument("--quota-rpm", type=int, default=0,
+                        help="Серверний ліміт запитів на хвилину для кожного ключа; перевищення дає 429 (0 - без ліміту).")
+    parser.add_argument("--keys", type=int, default=1, help="Кількість API-ключів (шардів) з окремими квотами.")
+    parser.add_argument("--rpm", type=int, default=0, help="Клієнтський ліміт RPM на ключ (0 - без ліміту).")
+    parser.add_argument("--tpm", type=int, default=0, help="Клієнтський ліміт TPM на ключ (0 - без ліміту).")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Спроб запиту при 429/5xx.")
+    parser.add_argument("--dag", action="store_true", help="Використовувати планувальник залежностей.")
+    parser.add_argument("--batch", type=int, default=0, help="Розмір пакета листових сторінок (0 - без пакетів).")
+    parser.add_argument("--stream", action="store_true", help="Потокова генерація.")
+    parser.add_argument("--skip-generation", action="store_true", help="Виміряти лише побудову структури.")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора випадкових чисел імітації API.")
+    parser.add_argument("--output", help="Файл для JSON-результатів (за замовчуванням - stdout).")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "runs": [],
+    }
+    original_cwd = os.getcwd()
+    for topics in args.sizes:
+        workdir = tempfile.mkdtemp(prefix=f"jv-docs-bench-{topics}-")
+        try:
+            pristine = os.path.join(workdir, "pristine")
+            os.makedirs(pristine)
+            os.chdir(pristine)
+            print(f"--- {topics} тем: побудова структури... ---", file=sys.stderr)
+            run = {"topics": topics, "structure": run_isolated(run_structure_stage, topics), "generation": []}
+            run["structure"]["qa_pages"] = add_qa_pages('.')
+
+            if not args.skip_generation:
+                for workers in args.workers:
+                    # Кожен режим стартує з однакового дерева
+                    tree_copy = os.path.join(workdir, f"workers-{workers}")
+                    shutil.copytree(pristine, tree_copy)
+                    os.chdir(tree_copy)
+                    print(f"--- {topics} тем: генерація, потоків {workers}... ---", file=sys.stderr)
+                    run["generation"].append(run_isolated(run_fake_generation_stage, workers, args))
+                    os.chdir(workdir)
+                    shutil.rmtree(tree_copy)
+            results["runs"].append(run)
+        finally:
+            os.chdir(original_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"Результати збережено у '{args.output}'.", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,16 @@ def initialize_config():
 
 GEMINI_API_KEY = initialize_config()
 
+def env_list(name: str) -> list[str]:
+    """
+    Повертає список значень зі змінної оточення, розділених комами.
+    """
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+# Кілька ключів (GEMINI_API_KEYS=key1,key2) і моделей (GEMINI_MODELS=m1,m2) розподіляють запити між шардами
+GEMINI_API_KEYS = env_list("GEMINI_API_KEYS") or ([GEMINI_API_KEY] if GEMINI_API_KEY else [])
+GEMINI_MODELS = env_list("GEMINI_MODELS")
+
 def load_prompt(file_path: str) -> str | None:
     """
     Завантажує текстовий промпт з файлу.
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from markdown_files import PLACEHOLDER_TEXT, get_file_data, read_front_matter, parse_tree, find_page_files
+
+
+@dataclass
+class DocNode:
+    """Сторінка документації (index.md або qa.md) з розібраним Front Matter."""
+    path: str
+    number: str | None
+    title: str
+    parent: str | None                  # шлях до index.md батьківського розділу
+    has_children: bool
+    children: list[str] = field(default_factory=list)   # шляхи до index.md підрозділів
+    front_matter: dict = field(default_factory=dict)
+    body: str | None = None             # завантажується при першому зверненні (DocTree.body)
+    mtime: int = 0
+
+
+def _node_key(path: str) -> str:
+    return os.path.normpath(path.lstrip('/'))
+
+
+class DocTree:
+    """
+    Індекс дерева документації, який будується один раз за запуск.
+    Кожен файл розбирається лише тоді, коли змінився його час модифікації,
+    тому повторні запити заголовків підрозділів чи змісту сторінок не читають диск повторно.
+    """
+
+    def __init__(self, root: str = '.', parse_workers: int | None = None):
+        self.root = root
+        self.parse_workers = parse_workers
+        self.nodes: dict[str, DocNode] = {}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def _full_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _parse(self, key: str, mtime: int) -> DocNode | None:
+        # Для побудови індексу потрібен лише заголовок файлу; контент читається за потреби
+        front_matter = read_front_matter(self._full_path(key))
+        if not front_matter:
+            return None
+        title = str(front_matter.get('title', ''))
+        match = re.match(r'([\d\.]+)', title)
+        return DocNode(
+            path=key,
+            number=match.group(1).rstrip('.') if match else None,
+            title=title,
+            parent=None,
+            has_children=bool(front_matter.get('has_children', False)),
+            front_matter=front_matter,
+            mtime=mtime,
+        )
+
+    def refresh(self):
+        """Синхронізує індекс з диском: перечитує лише нові та змінені файли, прибирає видалені."""
+        with self._lock:
+            seen = set()
+            # Масовий розбір заголовків (для великих дерев - у кількох процесах) заповнює кеш read_front_matter
+            parse_tree(self.root, self.parse_workers)
+            for page_path in find_page_files(self.root):
+                key = os.path.normpath(os.path.relpath(page_path, self.root))
+                seen.add(key)
+                self._refresh_key(key)
+            for key in set(self.nodes) - seen:
+                del self.nodes[key]
+            self._link()
+
+    def _refresh_key(self, key: str) -> DocNode | None:
+        try:
+            mtime = os.stat(self._full_path(key)).st_mtime_ns
+        except OSError:
+            self.nodes.pop(key, None)
+            return None
+        node = self.nodes.get(key)
+        if node and node.mtime == mtime:
+            return node
+        new_node = self._parse(key, mtime)
+        if new_node is None:
+            self.nodes.pop(key, None)
+            return None
+        if node:
+            new_node.parent, new_node.children = node.parent, node.children
+        self.nodes[key] = new_node
+        return new_node
+
+    def _link(self):
+        for node in self.nodes.values():
+            node.children = []
+        for key in sorted(self.nodes):
+            node = self.nodes[key]
+            directory = os.path.dirname(key)
+            if os.path.basename(key) == 'qa.md':
+                node.parent = os.path.join(directory, 'index.md') if directory else 'index.md'
+                continue
+            if not directory:
+                node.parent = None
+                continue
+            parent_key = os.path.join(os.path.dirname(directory), 'index.md')
+            parent_key = os.path.normpath(parent_key)
+            node.parent = parent_key if parent_key in self.nodes else None
+            if node.parent:
+                self.nodes[parent_key].children.append(key)
+        for node in self.nodes.values():
+            node.children.sort(key=lambda child_key: os.path.basename(os.path.dirname(child_key)))
+
+    def get(self, path: str) -> DocNode | None:
+        """Повертає актуальний вузол для файлу (перечитує його, якщо файл змінився)."""
+        key = _node_key(path)
+        with self._lock:
+            known = key in self.nodes
+            node = self._refresh_key(key)
+            if node and not known:
+                self._link()
+            return node
+
+    def refresh_file(self, path: str):
+        """Оновлює один вузол після запису файлу."""
+        self.get(path)
+
+    def child_titles(self, path: str) -> list[str]:
+        """Заголовки підрозділів сторінки index.md у порядку імен каталогів."""
+        with self._lock:
+            node = self.get(path)
+            if not node:
+                return []
+            titles = []
+            for child_key in list(node.children):
+                child = self.get(child_key)
+                if child and child.title:
+                    titles.append(child.title)
+            return titles
+
+    def child_summaries(self, path: str, excerpt_chars: int = 300) -> list[tuple[str, str]]:
+        """
+        Пари (заголовок, уривок змісту) для підрозділів, контент яких уже згенеровано.
+        Підрозділи із заглушкою замість контенту пропускаються.
+        """
+        with self._lock:
+            node = self.get(path)
+            if not node:
+                return []
+            summaries = []
+            for child_key in list(node.children):
+                child_body = self.body(child_key)
+                if not child_body or PLACEHOLDER_TEXT in child_body:
+                    continue
+                child = self.nodes[child_key]
+                # Посилання на Q&A після роздільника "* * *" не є частиною змісту
+                content = child_body.split('\n* * *')[0]
+                text_lines = [line.strip() for line in content.splitlines()
+                              if line.strip() and not line.lstrip().startswith('#')]
+                excerpt = " ".join(text_lines)[:excerpt_chars]
+                if excerpt:
+                    summaries.append((child.title, excerpt))
+            return summaries
+
+    def body(self, path: str) -> str | None:
+        """Основний контент сторінки (без Front Matter) або None, якщо сторінки немає."""
+        with self._lock:
+            node = self.get(path)
+            if not node:
+                return None
+            if node.body is None:
+                _, body = get_file_data(self._full_path(node.path))
+                node.body = body or ""
+            return node.body
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Відстеження змін вхідних файлів генерації (content.md, prompt/*.md, керуючий файл черги).
+
+На Linux використовується inotify (через ctypes, без додаткових залежностей): процес спить,
+доки ядро не повідомить про запис у відстежуваний каталог. На інших системах - опитування часу модифікації.
+Стежимо за каталогами, а не за файлами, бо редактори часто зберігають файл через тимчасовий файл
+і перейменування, після чого inotify-спостереження за самим файлом губиться.
+"""
+import ctypes
+import ctypes.util
+import fnmatch
+import glob
+import hashlib
+import os
+import select
+import struct
+import sys
+import time
+
+# Скільки чекати тиші після першої події, щоб серія записів (збереження, git checkout) дала один цикл
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Прапорці inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')   # wd, mask, cookie, len
+
+
+def content_digest(path: str) -> str | None:
+    """Хеш вмісту файлу (None, якщо файлу немає) - щоб відрізняти справжні зміни від повторного запису того самого."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _normalize(path: str) -> str:
+    return os.path.normpath(path)
+
+
+class PollingWatcher:
+    """Перевіряє час модифікації та розмір файлів за шаблонами кожні interval секунд."""
+
+    def __init__(self, patterns: list[str], debounce: float = DEFAULT_DEBOUNCE, interval: float = DEFAULT_POLL_INTERVAL):
+        self.patterns = [_normalize(pattern) for pattern in patterns]
+        self.debounce = debounce
+        self.interval = interval
+        self._state = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        state = {}
+        for pattern in self.patterns:
+            for path in glob.glob(pattern):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                state[_normalize(path)] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def _changes(self) -> set[str]:
+        state = self._scan()
+        changed = {path for path in state.keys() | self._state.keys() if state.get(path) != self._state.get(path)}
+        self._state = state
+        return changed
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Чекає на зміни (не довше timeout секунд) і повертає шляхи змінених файлів."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self._changes()
+            if changed:
+                time.sleep(self.debounce)
+                while True:
+                    more = self._changes()
+                    if not more:
+                        return changed
+                    changed |= more
+                    time.sleep(self.debounce)
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Стежить за каталогами файлів-шаблонів через inotify і повертає лише шляхи, що відповідають шаблонам."""
+
+    def __init__(self, patterns: list[str], debounce: float = DEFAULT_DEBOUNCE):
+        self.patterns = [_normalize(pattern) for pattern in patterns]
+        self.debounce = debounce
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._directories: dict[int, str] = {}
+        for directory in sorted({os.path.dirname(pattern) or '.' for pattern in self.patterns}):
+            if not os.path.isdir(directory):
+                print(f"   - ⚠️ Каталог '{directory}' не існує, зміни в ньому не відстежуються.")
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"inotify_add_watch '{directory}'")
+            self._directories[wd] = directory
+
+    def _matches(self, path: str) -> bool:
+        return any(fnmatch.fnmatchcase(path, pattern) for pattern in self.patterns)
+
+    def _read_events(self) -> set[str]:
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                # Черга подій ядра переповнилася: вважаємо зміненими всі наявні файли
+                changed.update(_normalize(path) for pattern in self.patterns for path in glob.glob(pattern))
+                continue
+            directory = self._directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = _normalize(os.path.join(directory, name))
+            if self._matches(path):
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Чекає на зміни (не довше timeout секунд) і повертає шляхи змінених файлів."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return changed
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return changed
+            changed = self._read_events()
+        # Події, що надходять одна за одною (тимчасовий файл + перейменування), збираються в один набір
+        while select.select([self._fd], [], [], self.debounce)[0]:
+            changed |= self._read_events()
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(patterns: list[str], polling: bool = False, debounce: float = DEFAULT_DEBOUNCE):
+    """Створює InotifyWatcher, якщо inotify доступний, інакше PollingWatcher."""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(patterns, debounce)
+        except (OSError, AttributeError) as e:
+            print(f"   - ⚠️ inotify недоступний ({e}), зміни відстежуються опитуванням.")
+    return PollingWatcher(patterns, debounce)
@@ -1,31 +1,220 @@
 # -*- coding: utf-8 -*-
-import google.generativeai as genai
 import time
+from collections.abc import Iterator
+from llm_backends import ShardedBackend, build_backend
+from rate_limiter import estimate_tokens
+from response_cache import ResponseCache
+from retry_policy import AdaptiveConcurrency, RetryPolicy, classify_error
+from telemetry import Telemetry
+
+MODEL_NAME = "gemini-1.5-flash-latest"
+
+# Шарди API (ключ × модель) з квотами та клієнтами моделей (встановлюється через set_backend)
+_backend: ShardedBackend | None = None
+# Кеш відповідей на диску (встановлюється через set_response_cache)
+_response_cache: ResponseCache | None = None
+_refresh_cache = False
+# Збирач метрик викликів (встановлюється через set_telemetry)
+_telemetry: Telemetry | None = None
+# Політика повторів і регулятор кількості одночасних запитів (set_retry_policy / set_concurrency)
+_retry_policy = RetryPolicy()
+_concurrency: AdaptiveConcurrency | None = None
+
+
+class GenerationError(Exception):
+    """Виклик API не вдався: помилка постійна або вичерпано всі спроби."""
+
 
 def configure_gemini(api_key: str):
-    """Налаштовує API-ключ для Gemini."""
+    """Налаштовує один API-ключ для Gemini і модель за замовчуванням, без обмеження запитів."""
     if not api_key:
         raise ValueError("API-ключ для Gemini не надано. Перевірте ваш .env файл.")
-    genai.configure(api_key=api_key)
+    set_backend(build_backend("gemini", [api_key], [MODEL_NAME]))
+
+def set_backend(backend: ShardedBackend | None):
+    """Встановлює бекенд моделей (шарди з ключами, моделями та квотами), спільний для всіх потоків."""
+    global _backend
+    _backend = backend
+
+def set_telemetry(telemetry: Telemetry | None):
+    """Встановлює збирач метрик для всіх викликів API."""
+    global _telemetry
+    _telemetry = telemetry
+
+def _record_call(prompt_type: str, started_at: float, outcome: str, usage=None, retries: int = 0, shard=None):
+    """Передає метрики одного виклику в телеметрію (якщо її увімкнено)."""
+    if not _telemetry:
+        return
+    _telemetry.record_call(
+        prompt_type, time.perf_counter() - started_at, outcome,
+        prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+        response_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        retries=retries,
+        shard=shard.label if shard else "",
+    )
+
+def set_retry_policy(policy: RetryPolicy):
+    """Встановлює політику повторів для тимчасових помилок API (429/5xx, мережа)."""
+    global _retry_policy
+    _retry_policy = policy
+
+def set_concurrency(concurrency: AdaptiveConcurrency | None):
+    """Встановлює AIMD-регулятор кількості одночасних запитів, спільний для всіх потоків."""
+    global _concurrency
+    _concurrency = concurrency
+
+def _send_with_retries(send, system_prompt: str, json_output: bool, estimated_tokens: int,
+                       prompt_type: str, started_at: float, keep_slot: bool = False):
+    """
+    Виконує send(model) з повторами тимчасових помилок. Кожна спроба займає місце в регуляторі
+    паралельності й отримує шард бекенду з вільною квотою RPM/TPM; під час очікування між спробами
+    місце звільняється. Якщо шард вибув (недійсний ключ, 429), а інший готовий, повтор іде одразу.
+    Повертає (результат send(), шард, кількість повторів); після постійної помилки
+    або останньої невдалої спроби викидає GenerationError.
+    З keep_slot=True після успішної спроби місце в регуляторі не звільняється: його звільняє
+    викликач, коли запит справді завершився (потокова відповідь прочитана до кінця).
+    """
+    if not _backend:
+        raise GenerationError("Бекенд моделей не налаштовано (див. configure_gemini / set_backend).")
+    attempt = 0
+    while True:
+        if _concurrency:
+            _concurrency.acquire()
+        shard = None
+        succeeded = False
+        try:
+            shard = _backend.acquire(estimated_tokens)
+            result = send(_backend.model(shard, system_prompt, json_output))
+        except Exception as e:
+            error = classify_error(e)
+            if error.is_rate_limit and _concurrency:
+                _concurrency.on_throttle()
+            rerouted = shard is not None and _backend.report_failure(shard, error)
+            attempt += 1
+            if not (error.retryable or rerouted) or attempt >= _retry_policy.max_attempts:
+                print(f"   - ❗️ Помилка під час виклику Gemini API: {e}")
+                _record_call(prompt_type, started_at, "error", retries=attempt - 1, shard=shard)
+                kind = "тимчасова помилка, вичерпано спроби" if error.retryable else "постійна помилка"
+                raise GenerationError(f"{e} ({kind}: {attempt})") from e
+            if rerouted:
+                delay = 0.0
+                print(f"   - ⚠️ Помилка шарду {shard.label} ({e}). Повтор {attempt} на іншому шарді.")
+            else:
+                delay = _retry_policy.delay(attempt, error)
+                print(f"   - ⚠️ Тимчасова помилка Gemini API ({e}). Повтор {attempt} через {delay:.1f} с.")
+        else:
+            _backend.report_success(shard)
+            if _concurrency:
+                _concurrency.on_success()
+            succeeded = True
+            return result, shard, attempt
+        finally:
+            if _concurrency and not (keep_slot and succeeded):
+                _concurrency.release()
+        time.sleep(delay)
+
+def set_response_cache(cache: ResponseCache | None, refresh: bool = False):
+    """
+    Встановлює кеш відповідей. При refresh=True кеш не читається,
+    але нові відповіді в нього записуються.
+    """
+    global _response_cache, _refresh_cache
+    _response_cache = cache
+    _refresh_cache = refresh
+
+def _cache_key(system_prompt: str, user_prompt: str) -> str | None:
+    """Ключ кешу для запиту; відповіді різних наборів моделей не змішуються."""
+    if not _response_cache:
+        return None
+    model_names = "+".join(_backend.model_names) if _backend else MODEL_NAME
+    return ResponseCache.make_key(model_names, system_prompt, user_prompt)
 
-def generate_conspectus(system_prompt: str, user_prompt: str) -> str:
+def generate_conspectus(system_prompt: str, user_prompt: str, prompt_type: str = "", json_output: bool = False) -> str:
     """
     Генерує контент, використовуючи наданий системний та користувацький промпт.
+    prompt_type (section/overview/topic/faq) використовується лише для метрик.
+    Тимчасові помилки (429/5xx) повторюються з затримкою; якщо запит так і не вдався, викидає GenerationError.
+    json_output=True просить модель повернути JSON (для пакетних запитів).
     """
-    try:
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash-latest",
-            system_instruction=system_prompt
-        )
-        
+    started_at = time.perf_counter()
+    cache_key = _cache_key(system_prompt, user_prompt)
+    if cache_key and not _refresh_cache:
+        cached_text = _response_cache.get(cache_key)
+        if cached_text:
+            print("   - Відповідь взято з кешу.")
+            _record_call(prompt_type, started_at, "cached")
+            return cached_text
+
+    def send(model):
         print("   - Відправка запиту до Gemini API...")
         response = model.generate_content(user_prompt)
-        
-        # Затримка для уникнення перевищення лімітів API (60 запитів на хвилину для Free tier)
-        time.sleep(1.5) 
-        
-        return response.text
+        # response.text викидає ValueError, якщо відповідь заблоковано; це постійна помилка
+        return response, response.text
+
+    # Замість фіксованої затримки кожна спроба чекає, доки запит вкладеться в ліміти RPM/TPM шарду
+    estimated_tokens = estimate_tokens(system_prompt, user_prompt)
+    (response, text), shard, retries = _send_with_retries(
+        send, system_prompt, json_output, estimated_tokens, prompt_type, started_at)
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        _backend.record_usage(shard, estimated_tokens, usage.total_token_count)
+
+    if cache_key:
+        _response_cache.put(cache_key, shard.model_name, text)
+
+    _record_call(prompt_type, started_at, "ok" if text else "empty", usage, retries, shard)
+    return text
 
+def generate_conspectus_stream(system_prompt: str, user_prompt: str, prompt_type: str = "") -> Iterator[str]:
+    """
+    Потокова версія generate_conspectus: повертає частини тексту в міру їх генерації.
+    Повторюється лише запит до першої частини відповіді; помилка посеред потоку
+    викидає GenerationError, щоб частково отриманий текст не було збережено як готову сторінку.
+    Місце в регуляторі паралельності зайняте, доки потік не прочитано до кінця (або не перервано).
+    """
+    started_at = time.perf_counter()
+    cache_key = _cache_key(system_prompt, user_prompt)
+    if cache_key and not _refresh_cache:
+        cached_text = _response_cache.get(cache_key)
+        if cached_text:
+            print("   - Відповідь взято з кешу.")
+            _record_call(prompt_type, started_at, "cached")
+            yield cached_text
+            return
+
+    def send(model):
+        print("   - Відправка потокового запиту до Gemini API...")
+        stream = iter(model.generate_content(user_prompt, stream=True))
+        return stream, next(stream, None)
+
+    estimated_tokens = estimate_tokens(system_prompt, user_prompt)
+    (stream, first_chunk), shard, retries = _send_with_retries(
+        send, system_prompt, False, estimated_tokens, prompt_type, started_at, keep_slot=True)
+
+    # Повний текст накопичується лише тоді, коли його потрібно зберегти в кеш
+    cached_parts = [] if cache_key else None
+    usage = None
+    chunk = first_chunk
+    try:
+        while chunk is not None:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.text
+            if text:
+                if cached_parts is not None:
+                    cached_parts.append(text)
+                yield text
+            chunk = next(stream, None)
     except Exception as e:
-        print(f"   - ❗️ Помилка під час виклику Gemini API: {e}")
-        return ""
+        print(f"   - ❗️ Помилка під час потокового виклику Gemini API: {e}")
+        _record_call(prompt_type, started_at, "error", retries=retries, shard=shard)
+        raise GenerationError(f"{e} (обрив потоку)") from e
+    finally:
+        if _concurrency:
+            _concurrency.release()
+
+    if usage:
+        _backend.record_usage(shard, estimated_tokens, usage.total_token_count)
+    if cache_key:
+        _response_cache.put(cache_key, shard.model_name, "".join(cached_parts))
+    _record_call(prompt_type, started_at, "ok", usage, retries, shard)
@@ -1,40 +1,51 @@
 # -*- coding: utf-8 -*-
 import os
-import yaml
 import re
-from config import GEMINI_API_KEY, load_prompt
-from gemini_service import configure_gemini, generate_conspectus
+import json
+import argparse
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from config import GEMINI_API_KEYS, GEMINI_MODELS, load_prompt
+from gemini_service import (MODEL_NAME, generate_conspectus, generate_conspectus_stream,
+                            set_backend, set_concurrency, set_response_cache, set_retry_policy, set_telemetry)
+from llm_backends import PROVIDERS, build_backend
+from retry_policy import AdaptiveConcurrency, RetryPolicy
+from response_cache import ResponseCache, DEFAULT_CACHE_DIR
+from queue_journal import QueueJournal
+from markdown_files import PLACEHOLDER_TEXT, AtomicPageWriter, update_file_content, write_file_atomic
+from doc_tree import DocTree
+from scheduler import DagScheduler, build_dependencies
+from telemetry import Telemetry, DEFAULT_TELEMETRY_DIR
+from generation_manifest import GenerationManifest, compute_fingerprint, DEFAULT_MANIFEST_FILE
+from batch_jobs import (DEFAULT_BATCH_REQUESTS_FILE, DEFAULT_BATCH_RESPONSES_FILE, make_key, make_request,
+                        read_responses, split_key, write_requests)
+from page_batches import build_batch_prompt, group_batches, leaf_prompt_type, parse_batch_response
+from script_create_structure import sync_structure
+from search_index import build_search_index
+from file_watcher import content_digest, create_watcher
 
 # --- Налаштування ---
 PROCESSING_LIST_FILE = "files_to_process.txt"
 FAIL_LOG_FILE = "fail_process.txt"
+QUEUE_JOURNAL_FILE = ".queue_journal.sqlite3"
+DEFAULT_WORKERS = 1
+DEFAULT_RPM = 60          # Запитів на хвилину (Free tier)
+DEFAULT_TPM = 1_000_000   # Токенів на хвилину (Free tier)
+DEFAULT_MAX_ATTEMPTS = 5  # Спроб запиту при 429/5xx
+STRUCTURE_FILE = "content.md"
+# Список змінених файлів останнього циклу watch для інкрементальної збірки сайту
+CHANGED_FILES_MANIFEST = ".changed_files.json"
+PROMPT_FILES = {
+    "section": "prompt/section_master_prompt.md",
+    "overview": "prompt/overview_master_prompt.md",
+    "topic": "prompt/topic_master_prompt.md",
+    "faq": "prompt/faq_master_prompt.md"
+}
 
-def get_file_data(file_path: str) -> tuple[dict | None, str | None]:
-    """
-    Читає YAML Front Matter та основний контент з Markdown файлу.
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            match = re.search(r'^---\s*\n(.*?)\n---\s*\n(.*)', content, re.DOTALL)
-            if match:
-                front_matter = yaml.safe_load(match.group(1))
-                main_content = match.group(2).strip()
-                return front_matter, main_content
-    except Exception as e:
-        print(f"   - Помилка читання файлу {file_path}: {e}")
-    return None, None
-
-def update_file_content(file_path: str, front_matter: dict, new_content: str):
-    """
-    Перезаписує файл, зберігаючи Front Matter та додаючи новий контент.
-    """
-    fm_string = yaml.dump(front_matter, allow_unicode=True, sort_keys=False)
-    full_content_to_write = f"---\n{fm_string}---\n{new_content}"
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(full_content_to_write)
-    print(f"   - ✅ Файл '{file_path}' успішно оновлено.")
+_fail_log_lock = threading.Lock()
 
 def get_files_to_process() -> list[str]:
     """Читає список файлів для обробки з керуючого файлу."""
@@ -49,30 +60,31 @@ def update_processing_list(remaining_files: list[str]):
     with open(PROCESSING_LIST_FILE, 'w', encoding='utf-8') as f:
         f.write("\n".join(remaining_files) + "\n" if remaining_files else "")
 
+def get_failed_files() -> list[str]:
+    """Читає список файлів, які не вдалося обробити, з лог-файлу."""
+    if not os.path.exists(FAIL_LOG_FILE):
+        return []
+    with open(FAIL_LOG_FILE, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
 def log_failed_file(file_path: str):
     """Додає шлях до файлу, який не вдалося обробити, у лог-файл."""
     with open(FAIL_LOG_FILE, 'a', encoding='utf-8') as f:
         f.write(f"{file_path}\n")
 
-def check_configuration() -> tuple[dict, bool]:
+def check_configuration(require_api_key: bool = True) -> tuple[dict, bool]:
     """Перевіряє всю необхідну конфігурацію."""
     print("--- Перевірка конфігурації ---")
     
-    if not GEMINI_API_KEY:
-        print("❌ ПОМИЛКА: API ключ не знайдено в .env")
-        return {}, False
-    print("✅ API ключ завантажено.")
-
-    prompt_files = {
-        "section": "prompt/section_master_prompt.md",
-        "overview": "prompt/overview_master_prompt.md",
-        "topic": "prompt/topic_master_prompt.md",
-        "faq": "prompt/faq_master_prompt.md"
-    }
-    
+    if require_api_key:
+        if not GEMINI_API_KEYS:
+            print("❌ ПОМИЛКА: API ключ не знайдено в .env (GEMINI_API_KEY або GEMINI_API_KEYS)")
+            return {}, False
+        print(f"✅ API ключів завантажено: {len(GEMINI_API_KEYS)}.")
+
     loaded_prompts = {}
     config_ok = True
-    for name, path in prompt_files.items():
+    for name, path in PROMPT_FILES.items():
         prompt_content = load_prompt(path)
         if prompt_content is None:
             print(f"❌ ПОМИЛКА: Файл інструкції не знайдено: '{path}'")
@@ -86,112 +98,727 @@ def check_configuration() -> tuple[dict, bool]:
     print("--- Конфігурація в порядку ---")
     return loaded_prompts, True
 
-def main():
-    """Головна функція для генерації контенту."""
-    prompts, config_ok = check_configuration()
-    if not config_ok: return
-        
+def build_user_prompt(clean_file_path: str, front_matter: dict, tree: DocTree) -> tuple[str, str]:
+    """
+    Визначає тип контенту (section/overview/topic/faq) та формує користувацький промпт.
+    Заголовки підрозділів і зміст пов'язаних сторінок беруться з індексу дерева документації.
+    """
+    master_prompt_key = None
+    user_prompt = None
+
+    if clean_file_path.endswith('qa.md'):
+        master_prompt_key = "faq"
+        full_title = front_matter.get('title', '')
+        topic_title = re.sub(r'[\d\.]+\s*Q&A\s*:?\s*', '', full_title, flags=re.IGNORECASE).strip()
+        related_summary = "відсутній"
+        summary_content = tree.body(os.path.join(os.path.dirname(clean_file_path), 'index.md'))
+        if summary_content: related_summary = summary_content
+        user_prompt = f'[TOPIC_TITLE]: "{topic_title}"\n[RELATED_SUMMARY]: "{related_summary[:4000]}"'
+
+    elif clean_file_path.endswith('index.md'):
+        full_title = front_matter.get('title', '')
+        match = re.match(r'([\d\.]+)', full_title)
+        if not match: raise ValueError("Не вдалося розпарсити номер з 'title' у Front Matter.")
+
+        topic_number = match.group(1)
+        level = len(topic_number.split('.'))
+
+        if front_matter.get('has_children', False):
+            sub_topics_list = tree.child_titles(clean_file_path)
+            sub_topics_str = ", ".join(filter(None, sub_topics_list)) if sub_topics_list else "відсутні"
+
+            if level <= 2:
+                master_prompt_key = "section"
+                user_prompt = f"Напиши дуже короткий оглядовий текст (1 абзац) для великого розділу '{full_title}'. Його основні підрозділи: {sub_topics_str}."
+            else:
+                master_prompt_key = "overview"
+                user_prompt = f"Напиши змістовний вступний текст (2-4 абзаци) для розділу '{full_title}'. Поясни, чому ця тема важлива, і коротко представ її підтеми: {sub_topics_str}."
+
+        else: # не має дочірніх елементів
+            master_prompt_key = "topic"
+            topic_title = re.sub(r'[\d\.]+\s*', '', full_title).strip()
+            parent_title = front_matter.get('parent', 'N/A')
+            user_prompt = f'[TOPIC_NUMBER]: "{topic_number}"\n[TOPIC_TITLE]: "{topic_title}"\n[PARENT_TOPIC_TITLE]: "{parent_title}"'
+
+    if not master_prompt_key: raise ValueError("Не вдалося визначити тип контенту.")
+    return master_prompt_key, user_prompt
+
+def child_summaries_prompt(clean_file_path: str, tree: DocTree) -> str:
+    """Короткий зміст уже згенерованих підрозділів для промпту огляду розділу (або порожній рядок)."""
+    sub_summaries = tree.child_summaries(clean_file_path)
+    if not sub_summaries:
+        return ""
+    summaries_str = "\n".join(f"- {title}: {excerpt}" for title, excerpt in sub_summaries)
+    return f"\nКороткий зміст підтем:\n{summaries_str[:4000]}"
+
+def navigation_links(clean_file_path: str) -> str:
+    """Повертає блок посилань між сторінкою теорії та сторінкою Q&A (або порожній рядок)."""
+    if clean_file_path.endswith('qa.md'):
+        return "\n\n* * *\n\n[Повернутись до теорії](./index.md)\n"
+    elif clean_file_path.endswith('index.md'):
+        qa_file_path = os.path.join(os.path.dirname(clean_file_path), 'qa.md')
+        if os.path.exists(qa_file_path):
+            return "\n\n* * *\n\n[Перейти до Q&A](./qa.md)\n"
+    return ""
+
+def add_navigation_links(clean_file_path: str, generated_content: str) -> str:
+    """Додає посилання між сторінкою теорії та сторінкою Q&A."""
+    return generated_content + navigation_links(clean_file_path)
+
+class GenerationContext:
+    """
+    Спільний для всіх потоків стан запуску: майстер-промпти, індекс дерева та маніфест генерації.
+    Подія stop (Ctrl+C) просить потоки не брати з черги нових файлів.
+    """
+
+    def __init__(self, prompts: dict, tree: DocTree, manifest: GenerationManifest, stream: bool = False,
+                 telemetry: Telemetry | None = None):
+        self.prompts = prompts
+        self.tree = tree
+        self.manifest = manifest
+        self.stream = stream
+        self.telemetry = telemetry
+        self.stop = threading.Event()
+        self._written: set[str] = set()
+        self._written_lock = threading.Lock()
+
+    def page_written(self, path: str, fingerprint: str):
+        """Оновлює індекс дерева і маніфест після запису сторінки та запам'ятовує її як змінену."""
+        self.tree.refresh_file(path)
+        self.manifest.record(path, fingerprint)
+        with self._written_lock:
+            self._written.add(path)
+
+    def take_written(self) -> list[str]:
+        """Повертає сторінки, записані з попереднього виклику, і очищає список."""
+        with self._written_lock:
+            written, self._written = sorted(self._written), set()
+        return written
+
+def page_fingerprint(clean_file_path: str, front_matter: dict, ctx: GenerationContext) -> tuple[str, str, str]:
+    """
+    Повертає (тип контенту, користувацький промпт, відбиток вхідних даних) для сторінки.
+    Відбиток оглядів розділів береться від заголовків підтем, а не від уривків їхнього змісту: інакше
+    перегенерація підтем робила б застарілими батьківські розділи, а за ними - усіх предків аж до кореня.
+    Уривки потрапляють лише в промпт. Для qa.md зміст теорії входить у відбиток (RELATED_SUMMARY),
+    тож після перегенерації index.md застаріває лише його власна сторінка Q&A - далі ланцюжок не йде.
+    """
+    master_prompt_key, user_prompt = build_user_prompt(clean_file_path, front_matter, ctx.tree)
+    fingerprint = compute_fingerprint(master_prompt_key, ctx.prompts[master_prompt_key], front_matter, user_prompt)
+    if master_prompt_key in ("section", "overview"):
+        user_prompt += child_summaries_prompt(clean_file_path, ctx.tree)
+    return master_prompt_key, user_prompt, fingerprint
+
+def process_file(file_path_from_list: str, ctx: GenerationContext):
+    """Генерує контент для одного файлу з черги. У разі помилки викидає виняток."""
+    clean_file_path = file_path_from_list.lstrip('/')
+    if not os.path.exists(clean_file_path):
+        raise FileNotFoundError(f"Файл '{clean_file_path}' не знайдено.")
+
+    print(f"\nОбробка файлу: '{clean_file_path}'")
+    node = ctx.tree.get(clean_file_path)
+    if not node:
+        raise ValueError("Не вдалося прочитати Front Matter.")
+    front_matter = dict(node.front_matter)
+
+    master_prompt_key, user_prompt, fingerprint = page_fingerprint(clean_file_path, front_matter, ctx)
+
+    master_prompt = ctx.prompts[master_prompt_key]
+    started_at = time.monotonic()
+    if ctx.stream:
+        first_token_at = write_streamed_page(clean_file_path, front_matter, master_prompt, user_prompt, master_prompt_key)
+    else:
+        generated_content = generate_conspectus(master_prompt, user_prompt, prompt_type=master_prompt_key)
+        if not generated_content: raise Exception("API повернуло порожню відповідь.")
+        first_token_at = time.monotonic()
+
+        final_content = add_navigation_links(clean_file_path, generated_content)
+        update_file_content(clean_file_path, front_matter, final_content)
+    finished_at = time.monotonic()
+    print(f"   - ⏱ Перший токен: {first_token_at - started_at:.2f} с, завершено за {finished_at - started_at:.2f} с.")
+    ctx.page_written(clean_file_path, fingerprint)
+
+def write_streamed_page(clean_file_path: str, front_matter: dict, master_prompt: str, user_prompt: str,
+                        prompt_type: str = "") -> float:
+    """
+    Записує відповідь у тимчасовий файл частинами в міру генерації і підміняє сторінку
+    атомарним перейменуванням. Повертає момент (time.monotonic) отримання першої частини.
+    """
+    first_token_at = None
+    with AtomicPageWriter(clean_file_path, front_matter) as writer:
+        for chunk in generate_conspectus_stream(master_prompt, user_prompt, prompt_type=prompt_type):
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            writer.write(chunk)
+        if first_token_at is None: raise Exception("API повернуло порожню відповідь.")
+        writer.write(navigation_links(clean_file_path))
+        writer.commit()
+    print(f"   - ✅ Файл '{clean_file_path}' успішно оновлено.")
+    return first_token_at
+
+def process_batch(file_paths: list[str], ctx: GenerationContext) -> list[str]:
+    """
+    Генерує кілька сусідніх листових сторінок одного типу одним запитом зі структурованою (JSON) відповіддю
+    і розкладає її по файлах. Повертає сторінки, для яких відповідь відсутня або пошкоджена.
+    Якщо сам запит не вдався, викидає виняток.
+    """
+    print(f"\nПакетна обробка {len(file_paths)} файлів: {', '.join(file_paths)}")
+    pages = []
+    for file_path in file_paths:
+        clean_file_path = file_path.lstrip('/')
+        node = ctx.tree.get(clean_file_path)
+        if not node or not node.number:
+            raise ValueError(f"Не вдалося прочитати Front Matter або номер теми '{clean_file_path}'.")
+        front_matter = dict(node.front_matter)
+        master_prompt_key, user_prompt, fingerprint = page_fingerprint(clean_file_path, front_matter, ctx)
+        pages.append((file_path, clean_file_path, node.number, front_matter, user_prompt, fingerprint))
+
+    master_prompt_key = leaf_prompt_type(pages[0][1], pages[0][3])
+    batch_prompt = build_batch_prompt([(number, user_prompt) for _, _, number, _, user_prompt, _ in pages])
+    generated = generate_conspectus(ctx.prompts[master_prompt_key], batch_prompt,
+                                    prompt_type=master_prompt_key, json_output=True)
+    contents = parse_batch_response(generated, [number for _, _, number, _, _, _ in pages])
+
+    leftovers = []
+    for file_path, clean_file_path, number, front_matter, _, fingerprint in pages:
+        if number not in contents:
+            leftovers.append(file_path)
+            continue
+        update_file_content(clean_file_path, front_matter, add_navigation_links(clean_file_path, contents[number]))
+        ctx.page_written(clean_file_path, fingerprint)
+    return leftovers
+
+def finish_queued_file(journal: QueueJournal, file_path: str, ctx: GenerationContext, error: Exception | None = None):
+    """Записує результат обробки файлу в журнал, лог помилок і телеметрію."""
+    is_successful = error is None
+    if is_successful:
+        journal.ack(file_path)
+    else:
+        print(f"   - ❌ Помилка під час обробки {file_path}: {error}")
+        journal.fail(file_path, str(error) or type(error).__name__)
+        with _fail_log_lock:
+            log_failed_file(file_path)
+    remaining = journal.remaining()
+    if ctx.telemetry:
+        ctx.telemetry.record_page(file_path, is_successful, remaining)
+    print(f"   - Залишилось в черзі: {remaining} файлів.")
+
+def process_queued_file(journal: QueueJournal, file_path: str, ctx: GenerationContext):
+    """Обробляє файл, уже позначений у журналі як in_flight, і записує результат у журнал."""
     try:
-        configure_gemini(GEMINI_API_KEY)
-    except ValueError as e:
-        print(e)
-        return
+        process_file(file_path, ctx)
+    except Exception as e:
+        finish_queued_file(journal, file_path, ctx, e)
+    else:
+        finish_queued_file(journal, file_path, ctx)
 
-    files_queue = get_files_to_process()
-    if not files_queue:
-        print("\nСписок файлів ('files_to_process.txt') порожній. Завершення роботи.")
+def process_queued_batch(journal: QueueJournal, file_paths: list[str], ctx: GenerationContext):
+    """
+    Обробляє пакет файлів, уже позначених у журналі як in_flight. Сторінки, для яких
+    пакетна відповідь пошкоджена, повторно генеруються поодинці.
+    """
+    try:
+        leftovers = process_batch(file_paths, ctx)
+    except Exception as e:
+        for file_path in file_paths:
+            finish_queued_file(journal, file_path, ctx, e)
         return
+    for file_path in file_paths:
+        if file_path not in leftovers:
+            finish_queued_file(journal, file_path, ctx)
+    for file_path in leftovers:
+        print(f"   - Пакетна відповідь для '{file_path}' відсутня або пошкоджена, окремий запит.")
+        process_queued_file(journal, file_path, ctx)
+
+def run_worker(journal: QueueJournal, ctx: GenerationContext):
+    """Бере файли з журналу черги в порядку черги, доки вона не спорожніє або не надійде зупинка."""
+    while not ctx.stop.is_set():
+        file_path = journal.dequeue()
+        if file_path is None:
+            return
+        process_queued_file(journal, file_path, ctx)
+
+def run_dag_worker(journal: QueueJournal, scheduler: DagScheduler, ctx: GenerationContext):
+    """Бере файли з планувальника залежностей, доки всі файли не буде оброблено або не надійде зупинка."""
+    while not ctx.stop.is_set():
+        file_path = scheduler.next()
+        if file_path is None:
+            return
+        try:
+            if journal.claim(file_path):
+                process_queued_file(journal, file_path, ctx)
+        finally:
+            scheduler.done(file_path)
+
+def run_batch_worker(journal: QueueJournal, units: deque, ctx: GenerationContext):
+    """Бере одиниці роботи (пакети сусідніх сторінок або окремі файли), доки вони не закінчаться або не надійде зупинка."""
+    while not ctx.stop.is_set():
+        try:
+            unit = units.popleft()
+        except IndexError:
+            return
+        claimed = [file_path for file_path in unit if journal.claim(file_path)]
+        if len(claimed) > 1:
+            process_queued_batch(journal, claimed, ctx)
+        elif claimed:
+            process_queued_file(journal, claimed[0], ctx)
+
+def plan_batches(journal: QueueJournal, tree: DocTree, batch_size: int) -> deque:
+    """Групує файли черги в пакети сусідніх листових сторінок одного типу (див. page_batches.group_batches)."""
+    pending = journal.pending_paths()
+    prompt_types = {}
+    for file_path in pending:
+        node = tree.get(file_path.lstrip('/'))
+        prompt_types[file_path] = leaf_prompt_type(node.path, node.front_matter) if node and node.number else None
+    units = group_batches(pending, prompt_types, batch_size)
+    batched = sum(len(unit) for unit in units if len(unit) > 1)
+    print(f"Пакетний режим: {batched} файлів у пакетах до {batch_size}, запитів буде {len(units)}.")
+    return deque(units)
 
-    print(f"\n🚀 Початок генерації контенту. В черзі {len(files_queue)} файлів...")
+def start_workers(executor: ThreadPoolExecutor, journal: QueueJournal, ctx: GenerationContext,
+                  workers: int, dag: bool = False, batch_size: int = 0) -> list:
+    """Запускає потоки обробки черги у вибраному режимі (звичайний, DAG або пакетний)."""
+    if dag:
+        pending = journal.pending_paths()
+        scheduler = DagScheduler(pending, build_dependencies(pending, ctx.tree), stop=ctx.stop)
+        return [executor.submit(run_dag_worker, journal, scheduler, ctx) for _ in range(workers)]
+    if batch_size > 1:
+        units = plan_batches(journal, ctx.tree, batch_size)
+        return [executor.submit(run_batch_worker, journal, units, ctx) for _ in range(workers)]
+    return [executor.submit(run_worker, journal, ctx) for _ in range(workers)]
 
-    while files_queue:
-        file_path_from_list = files_queue.pop(0)
+def run_queue(executor: ThreadPoolExecutor, journal: QueueJournal, ctx: GenerationContext, args: argparse.Namespace):
+    """
+    Обробляє чергу до кінця потоками вже створеного пулу і зберігає маніфест.
+    Ctrl+C зупиняє видачу нових файлів: файли, що вже обробляються, завершуються,
+    решта лишається в журналі черги, після чого KeyboardInterrupt передається далі.
+    """
+    workers = start_workers(executor, journal, ctx, args.workers, args.dag, args.batch)
+    try:
+        for worker in workers:
+            worker.result()
+    except KeyboardInterrupt:
+        ctx.stop.set()
+        print("\n⏹ Зупинка: файли, що вже обробляються, буде завершено, решта лишиться в черзі...")
+        for worker in workers:
+            worker.result()
+        raise
+    finally:
+        ctx.manifest.save()
+
+def load_queue(journal: QueueJournal, retry_failed: bool):
+    """
+    Переносить файли з 'files_to_process.txt' (і, за потреби, з 'fail_process.txt') у журнал черги.
+    Після імпорту керуючі файли очищуються, щоб ті самі записи не потрапили в чергу двічі.
+    """
+    recovered = journal.recover()
+    if recovered:
+        print(f"Відновлено після збою: {recovered} незавершених файлів повернуто в чергу.")
+
+    if retry_failed:
+        requeued = journal.requeue_failed() + journal.enqueue(get_failed_files())
+        open(FAIL_LOG_FILE, 'w', encoding='utf-8').close()
+        print(f"Повторна обробка: {requeued} файлів з помилками повернуто в чергу.")
+
+    imported = journal.enqueue(get_files_to_process())
+    if imported:
+        print(f"Імпортовано з '{PROCESSING_LIST_FILE}': {imported} файлів.")
+    update_processing_list([])
+
+def plan_queue(journal: QueueJournal, ctx: GenerationContext, adopt: bool = False):
+    """
+    Обходить дерево документації і ставить у чергу лише застарілі сторінки -
+    ті, чиї вхідні дані генерації змінилися з моменту останньої генерації.
+    З adopt=True сторінки з уже згенерованим контентом не ставляться в чергу,
+    а їхні поточні відбитки записуються в маніфест як актуальні.
+    """
+    # Спершу глибші сторінки, а в межах каталогу index.md перед qa.md
+    nodes = sorted(ctx.tree.nodes.values(),
+                   key=lambda n: (-n.path.count(os.sep), os.path.basename(n.path) == 'qa.md', n.path))
+    stale = []
+    stale_by_type = {name: 0 for name in ctx.prompts}
+    adopted = 0
+    for node in nodes:
+        if node.number is None:
+            continue
+        try:
+            master_prompt_key, _, fingerprint = page_fingerprint(node.path, node.front_matter, ctx)
+        except ValueError as e:
+            print(f"   - Пропущено '{node.path}': {e}")
+            continue
+        if not ctx.manifest.is_stale(node.path, fingerprint):
+            continue
+        if adopt and PLACEHOLDER_TEXT not in ctx.tree.body(node.path):
+            ctx.manifest.record(node.path, fingerprint)
+            adopted += 1
+            continue
+        stale.append(node.path)
+        stale_by_type[master_prompt_key] += 1
+
+    ctx.manifest.save()
+    added = journal.enqueue(stale)
+    print(f"--- План генерації: застарілих сторінок {len(stale)}, додано в чергу {added} ---")
+    for name, count in stale_by_type.items():
+        print(f"   {name:<10} {count}")
+    if adopt:
+        print(f"   Позначено актуальними: {adopted}")
+
+def export_batch(journal: QueueJournal, ctx: GenerationContext, file_path: str):
+    """
+    Записує повністю зібрані запити (системна інструкція, користувацький промпт, ключ сторінки)
+    для файлів черги у JSONL-файл пакетного завдання. Сторінки, промпт яких містить зміст інших сторінок
+    черги (огляди розділів, qa.md), відкладаються до наступного експорту - після імпорту їхніх залежностей.
+    """
+    pending = journal.pending_paths()
+    dependencies = build_dependencies(pending, ctx.tree)
+    requests = []
+    deferred = 0
+    for file_path_from_list in pending:
+        if dependencies[file_path_from_list]:
+            deferred += 1
+            continue
         clean_file_path = file_path_from_list.lstrip('/')
-        
-        is_successful = False
+        node = ctx.tree.get(clean_file_path)
+        if not node:
+            print(f"   - Пропущено '{clean_file_path}': не вдалося прочитати Front Matter.")
+            continue
         try:
-            if not os.path.exists(clean_file_path):
-                raise FileNotFoundError(f"Файл '{clean_file_path}' не знайдено.")
-            
-            print(f"\nОбробка файлу: '{clean_file_path}'")
-            front_matter, _ = get_file_data(clean_file_path)
-            if not front_matter:
-                raise ValueError("Не вдалося прочитати Front Matter.")
+            master_prompt_key, user_prompt, fingerprint = page_fingerprint(clean_file_path, dict(node.front_matter), ctx)
+        except ValueError as e:
+            print(f"   - Пропущено '{clean_file_path}': {e}")
+            continue
+        requests.append(make_request(make_key(clean_file_path, fingerprint), ctx.prompts[master_prompt_key], user_prompt))
 
-            master_prompt_key = None
-            user_prompt = None
-            
-            if clean_file_path.endswith('qa.md'):
-                master_prompt_key = "faq"
-                full_title = front_matter.get('title', '')
-                topic_title = re.sub(r'[\d\.]+\s*Q&A\s*:?\s*', '', full_title, flags=re.IGNORECASE).strip()
-                related_summary = "відсутній"
-                related_index_path = os.path.join(os.path.dirname(clean_file_path), 'index.md')
-                if os.path.exists(related_index_path):
-                    _, summary_content = get_file_data(related_index_path)
-                    if summary_content: related_summary = summary_content
-                user_prompt = f'[TOPIC_TITLE]: "{topic_title}"\n[RELATED_SUMMARY]: "{related_summary[:4000]}"'
-
-            elif clean_file_path.endswith('index.md'):
-                full_title = front_matter.get('title', '')
-                match = re.match(r'([\d\.]+)', full_title)
-                if not match: raise ValueError("Не вдалося розпарсити номер з 'title' у Front Matter.")
-                
-                topic_number = match.group(1)
-                level = len(topic_number.split('.'))
-                
-                if front_matter.get('has_children', False):
-                    sub_topics_list = []
-                    sub_dirs = sorted([d for d in os.listdir(os.path.dirname(clean_file_path)) if os.path.isdir(os.path.join(os.path.dirname(clean_file_path), d))])
-                    for sub_dir in sub_dirs:
-                        sub_index_path = os.path.join(os.path.dirname(clean_file_path), sub_dir, 'index.md')
-                        if os.path.exists(sub_index_path):
-                            sub_fm, _ = get_file_data(sub_index_path)
-                            if sub_fm: sub_topics_list.append(sub_fm.get('title', ''))
-                    sub_topics_str = ", ".join(filter(None, sub_topics_list)) if sub_topics_list else "відсутні"
-
-                    if level <= 2:
-                        master_prompt_key = "section"
-                        user_prompt = f"Напиши дуже короткий оглядовий текст (1 абзац) для великого розділу '{full_title}'. Його основні підрозділи: {sub_topics_str}."
-                    else:
-                        master_prompt_key = "overview"
-                        user_prompt = f"Напиши змістовний вступний текст (2-4 абзаци) для розділу '{full_title}'. Поясни, чому ця тема важлива, і коротко представ її підтеми: {sub_topics_str}."
-
-                else: # не має дочірніх елементів
-                    master_prompt_key = "topic"
-                    topic_title = re.sub(r'[\d\.]+\s*', '', full_title).strip()
-                    parent_title = front_matter.get('parent', 'N/A')
-                    user_prompt = f'[TOPIC_NUMBER]: "{topic_number}"\n[TOPIC_TITLE]: "{topic_title}"\n[PARENT_TOPIC_TITLE]: "{parent_title}"'
-            
-            if not master_prompt_key: raise ValueError("Не вдалося визначити тип контенту.")
-            
-            master_prompt = prompts[master_prompt_key]
-            generated_content = generate_conspectus(master_prompt, user_prompt)
-            if not generated_content: raise Exception("API повернуло порожню відповідь.")
-
-            # --- Оновлена логіка додавання посилань ---
-            final_content = generated_content
-            if clean_file_path.endswith('qa.md'):
-                final_content += "\n\n* * *\n\n[Повернутись до теорії](./index.md)\n"
-            elif clean_file_path.endswith('index.md'):
-                qa_file_path = os.path.join(os.path.dirname(clean_file_path), 'qa.md')
-                if os.path.exists(qa_file_path):
-                    final_content += "\n\n* * *\n\n[Перейти до Q&A](./qa.md)\n"
-
-            update_file_content(clean_file_path, front_matter, final_content)
-            is_successful = True
-
-        except Exception as e:
-            print(f"   - ❌ Помилка під час обробки {clean_file_path}: {e}")
-            is_successful = False
-
-        if not is_successful:
-            log_failed_file(file_path_from_list)
-        
-        update_processing_list(files_queue)
-        print(f"   - Залишилось в черзі: {len(files_queue)} файлів.")
+    write_requests(file_path, requests)
+    print(f"--- Експортовано запитів: {len(requests)} у '{file_path}' ---")
+    if deferred:
+        print(f"   Відкладено до наступного експорту (залежать від сторінок цього пакета): {deferred}")
+
+def import_batch(journal: QueueJournal, ctx: GenerationContext, file_path: str):
+    """
+    Застосовує JSONL-файл результатів пакетного завдання за один прохід: додає навігаційні посилання,
+    записує сторінки, оновлює маніфест і журнал черги. Відповіді для сторінок, вхідні дані яких
+    змінилися після експорту, пропускаються.
+    """
+    applied = skipped = failed = 0
+    for key, text, error in read_responses(file_path):
+        clean_file_path, exported_fingerprint = split_key(key)
+        clean_file_path = clean_file_path.lstrip('/')
+        node = ctx.tree.get(clean_file_path)
+        if not node:
+            print(f"   - Пропущено '{clean_file_path}': файл не знайдено або не вдалося прочитати Front Matter.")
+            skipped += 1
+            continue
+        front_matter = dict(node.front_matter)
+        try:
+            _, _, fingerprint = page_fingerprint(clean_file_path, front_matter, ctx)
+        except ValueError as e:
+            print(f"   - Пропущено '{clean_file_path}': {e}")
+            skipped += 1
+            continue
+        if not exported_fingerprint or not fingerprint.startswith(exported_fingerprint):
+            print(f"   - Пропущено '{clean_file_path}': вхідні дані змінилися після експорту.")
+            skipped += 1
+            continue
+
+        # Файли, яких немає в черзі, теж оновлюються, але журнал для них не змінюється
+        is_queued = journal.claim(clean_file_path)
+        if error or not text:
+            reason = error or "API повернуло порожню відповідь."
+            failed += 1
+            if is_queued:
+                finish_queued_file(journal, clean_file_path, ctx, Exception(reason))
+            else:
+                print(f"   - ❌ Помилка для {clean_file_path}: {reason}")
+            continue
+        update_file_content(clean_file_path, front_matter, add_navigation_links(clean_file_path, text))
+        ctx.page_written(clean_file_path, fingerprint)
+        applied += 1
+        if is_queued:
+            finish_queued_file(journal, clean_file_path, ctx)
+
+    ctx.manifest.save()
+    print(f"--- Імпорт пакета: застосовано {applied}, з помилками {failed}, пропущено {skipped} ---")
+    if journal.remaining():
+        print(f"   В черзі ще {journal.remaining()} файлів (зокрема відкладені при експорті); запустіть export-batch повторно.")
+
+def print_queue_status(journal: QueueJournal):
+    """Виводить стан журналу черги та причини помилок."""
+    counts = journal.counts()
+    print("--- Стан черги ---")
+    for state, count in counts.items():
+        print(f"   {state:<10} {count}")
+    for path, attempts, reason in journal.failures():
+        print(f"   ❌ {path} (спроб: {attempts}): {reason}")
+
+def sync_from_outline(ctx: GenerationContext) -> list[str]:
+    """Приводить дерево каталогів у відповідність до content.md і оновлює індекс дерева. Повертає змінені шляхи."""
+    try:
+        with open(STRUCTURE_FILE, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        print(f"   - ⚠️ Файл '{STRUCTURE_FILE}' не знайдено, структуру не оновлено.")
+        return []
+    changed = sync_structure(lines)
+    if changed:
+        ctx.tree.refresh()
+    return changed
+
+def reload_prompts(ctx: GenerationContext, changed_paths: set[str]) -> list[str]:
+    """Перечитує змінені майстер-промпти. Повертає назви промптів, зміст яких справді змінився."""
+    reloaded = []
+    for name, path in PROMPT_FILES.items():
+        if os.path.normpath(path) not in changed_paths:
+            continue
+        prompt_content = load_prompt(path)
+        if prompt_content is None:
+            print(f"   - ⚠️ Файл інструкції '{path}' недоступний, залишається попередня версія.")
+        elif prompt_content != ctx.prompts.get(name):
+            ctx.prompts[name] = prompt_content
+            reloaded.append(name)
+            print(f"   - Інструкцію '{name}' перезавантажено.")
+    return reloaded
+
+def write_changed_files(cycle: int, paths: list[str], file_path: str = CHANGED_FILES_MANIFEST) -> int:
+    """
+    Атомарно записує маніфест змінених файлів циклу watch: змінені та видалені шляхи
+    відносно кореня сайту. Його читає команда --on-change (наприклад, інкрементальна збірка Jekyll).
+    Повертає кількість записаних шляхів (без повторів).
+    """
+    paths = sorted({os.path.normpath(path) for path in paths})
+    manifest = {
+        "cycle": cycle,
+        "ts": round(time.time(), 3),
+        "changed": [path for path in paths if os.path.exists(path)],
+        "removed": [path for path in paths if not os.path.exists(path)],
+    }
+    write_file_atomic(file_path, json.dumps(manifest, ensure_ascii=False, indent=2))
+    return len(paths)
+
+def run_watch_cycle(journal: QueueJournal, ctx: GenerationContext, executor: ThreadPoolExecutor,
+                    args: argparse.Namespace, changed_inputs: set[str], digests: dict, initial: bool = False) -> list[str]:
+    """
+    Один цикл watch: застосовує змінені вхідні файли, генерує лише зачеплені сторінки
+    і оновлює пошуковий індекс. Повертає шляхи файлів сайту, змінених за цикл.
+    Перший цикл (initial) наздоганяє зміни, зроблені, поки watch не працював; якщо маніфесту
+    генерації ще немає, вже згенеровані сторінки в ньому лише позначаються актуальними.
+    """
+    changed_files = []
+    if STRUCTURE_FILE in changed_inputs or (initial and os.path.exists(STRUCTURE_FILE)):
+        changed_files += sync_from_outline(ctx)
+    reloaded = reload_prompts(ctx, changed_inputs)
+    if initial or PROCESSING_LIST_FILE in changed_inputs:
+        load_queue(journal, initial and args.retry_failed)
+        # Очищення керуючого файлу - власний запис, а не нова зміна
+        digests[PROCESSING_LIST_FILE] = content_digest(PROCESSING_LIST_FILE)
+    # Відбитки сторінок змінюються лише разом зі структурою або промптами
+    if initial or changed_files or reloaded:
+        # Без маніфесту застарілою здається кожна сторінка; вже згенеровані сторінки не перегенеровуються,
+        # а їхні відбитки записуються як актуальні (як plan --adopt)
+        adopt = initial and (args.adopt or ctx.manifest.is_empty)
+        if adopt and not args.adopt:
+            print(f"Маніфест '{args.manifest}' порожній: вже згенеровані сторінки буде позначено актуальними.")
+        plan_queue(journal, ctx, adopt=adopt)
+    if journal.remaining():
+        print(f"\n🚀 В черзі {journal.remaining()} файлів (потоків: {args.workers})...")
+        run_queue(executor, journal, ctx, args)
+    changed_files += ctx.take_written()
+    if changed_files:
+        changed_files += build_search_index()
+    return changed_files
+
+def run_on_change(command: str):
+    """Запускає команду після циклу watch; шлях до маніфесту змінених файлів передається в CHANGED_FILES."""
+    print(f"--- Виконання: {command} ---")
+    result = subprocess.run(command, shell=True, env={**os.environ, "CHANGED_FILES": CHANGED_FILES_MANIFEST})
+    if result.returncode:
+        print(f"   - ⚠️ Команда завершилася з кодом {result.returncode}.")
+
+def watch(journal: QueueJournal, ctx: GenerationContext, executor: ThreadPoolExecutor, args: argparse.Namespace):
+    """
+    Режим спостереження: промпти, клієнти моделей, індекс дерева і пул потоків залишаються в пам'яті між циклами.
+    Кожна зміна content.md, майстер-промптів або керуючого файлу черги запускає цикл, після якого
+    записується маніфест змінених файлів і виконується команда --on-change. Ctrl+C - вихід.
+    """
+    watched = [STRUCTURE_FILE, os.path.join("prompt", "*.md"), PROCESSING_LIST_FILE]
+    # Вміст уже оброблених версій: подія без зміни вмісту (повторне збереження, touch) не запускає цикл
+    digests = {path: content_digest(path) for path in [STRUCTURE_FILE, PROCESSING_LIST_FILE, *PROMPT_FILES.values()]}
+    watcher = create_watcher(watched, polling=args.poll)
+    cycle = 0
+    changed_inputs, initial = set(), True
+    try:
+        while True:
+            if not initial:
+                changed_inputs = set()
+                for path in watcher.wait():
+                    digest = content_digest(path)
+                    if digest != digests.get(path):
+                        digests[path] = digest
+                        changed_inputs.add(path)
+                if not changed_inputs:
+                    continue
+                print(f"\n🔄 Змінено: {', '.join(sorted(changed_inputs))}")
+            changed_files = run_watch_cycle(journal, ctx, executor, args, changed_inputs, digests, initial)
+            initial = False
+            if changed_files:
+                cycle += 1
+                written = write_changed_files(cycle, changed_files)
+                print(f"--- Цикл {cycle}: змінено файлів {written}, список у '{CHANGED_FILES_MANIFEST}' ---")
+                if args.on_change:
+                    run_on_change(args.on_change)
+            print(f"\n👀 Очікування змін у {', '.join(watched)} (Ctrl+C - вихід)...")
+    except KeyboardInterrupt:
+        # Сторінки, завершені в перерваному циклі, теж мають потрапити до маніфесту змінених файлів
+        finished = ctx.take_written()
+        if finished:
+            cycle += 1
+            written = write_changed_files(cycle, finished)
+            print(f"\n--- Перерваний цикл {cycle}: змінено файлів {written}, список у '{CHANGED_FILES_MANIFEST}' ---")
+        print("\nРежим спостереження зупинено.")
+    finally:
+        watcher.close()
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Генерація контенту сторінок за допомогою Gemini API.")
+    parser.add_argument("command", nargs="?", choices=["run", "plan", "export-batch", "import-batch", "watch"], default="run",
+                        help="run - обробити чергу (за замовчуванням); plan - додати в чергу лише застарілі сторінки; "
+                             "export-batch - записати запити черги у JSONL для пакетного завдання; "
+                             "import-batch - застосувати JSONL з результатами пакетного завдання; "
+                             "watch - стежити за content.md, промптами і чергою та генерувати лише зачеплені сторінки.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Кількість одночасних генерацій (за замовчуванням {DEFAULT_WORKERS}).")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="gemini",
+                        help="Провайдер моделей: gemini (за замовчуванням) або local - детермінована локальна заміна API.")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM,
+                        help=f"Ліміт запитів на хвилину для кожного шарду (ключ × модель), за замовчуванням {DEFAULT_RPM}.")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TPM,
+                        help=f"Ліміт токенів на хвилину для кожного шарду (ключ × модель), за замовчуванням {DEFAULT_TPM}.")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Кількість спроб запиту при тимчасових помилках API (429/5xx), за замовчуванням {DEFAULT_MAX_ATTEMPTS}.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Не використовувати кеш відповідей Gemini.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ігнорувати збережені відповіді, але оновити їх у кеші.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Каталог кешу відповідей (за замовчуванням '{DEFAULT_CACHE_DIR}').")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Повернути в чергу файли з помилками (з журналу та 'fail_process.txt').")
+    parser.add_argument("--dag", action="store_true",
+                        help="Обробляти файли з урахуванням залежностей: спершу підтеми, потім огляди розділів; qa.md - після index.md.")
+    parser.add_argument("--batch", type=int, default=0, metavar="K",
+                        help="Пакетний режим: до K сусідніх листових сторінок одного типу (topic/faq) в одному запиті.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Потокова генерація: відповідь пишеться у тимчасовий файл частинами і атомарно підміняє сторінку.")
+    parser.add_argument("--telemetry-dir", default=DEFAULT_TELEMETRY_DIR,
+                        help=f"Каталог для траси (JSONL) та метрик Prometheus (за замовчуванням '{DEFAULT_TELEMETRY_DIR}').")
+    parser.add_argument("--no-telemetry", action="store_true",
+                        help="Не записувати трасу та метрики на диск (підсумкова таблиця все одно виводиться).")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_FILE,
+                        help=f"Файл маніфесту відбитків згенерованих сторінок (за замовчуванням '{DEFAULT_MANIFEST_FILE}').")
+    parser.add_argument("--adopt", action="store_true",
+                        help="Для plan і першого циклу watch: вважати вже згенеровані сторінки без актуального запису в маніфесті "
+                             "актуальними (watch робить це сам, якщо маніфесту ще немає).")
+    parser.add_argument("--batch-file",
+                        help=f"Файл пакетного завдання (за замовчуванням '{DEFAULT_BATCH_REQUESTS_FILE}' для export-batch "
+                             f"і '{DEFAULT_BATCH_RESPONSES_FILE}' для import-batch).")
+    parser.add_argument("--on-change", metavar="CMD",
+                        help=f"Для watch: команда після кожного циклу зі змінами (наприклад, 'make build-incremental'); "
+                             f"список змінених файлів - у '{CHANGED_FILES_MANIFEST}'.")
+    parser.add_argument("--poll", action="store_true",
+                        help="Для watch: опитувати файли замість inotify (для мережевих і змонтованих файлових систем).")
+    parser.add_argument("--status", action="store_true",
+                        help="Показати стан черги і завершити роботу.")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers має бути не менше 1.")
+    if args.batch and args.dag:
+        parser.error("--batch не поєднується з --dag.")
+    return args
+
+def main(argv: list[str] | None = None):
+    """Головна функція для генерації контенту."""
+    args = parse_args(argv)
+
+    if args.status:
+        journal = QueueJournal(QUEUE_JOURNAL_FILE)
+        print_queue_status(journal)
+        journal.close()
+        return
+
+    if args.command == "plan":
+        prompts, config_ok = check_configuration(require_api_key=False)
+        if not config_ok: return
+        journal = QueueJournal(QUEUE_JOURNAL_FILE)
+        plan_queue(journal, GenerationContext(prompts, DocTree('.'), GenerationManifest(args.manifest)), args.adopt)
+        journal.close()
+        return
+
+    if args.command in ("export-batch", "import-batch"):
+        prompts, config_ok = check_configuration(require_api_key=False)
+        if not config_ok: return
+        journal = QueueJournal(QUEUE_JOURNAL_FILE)
+        ctx = GenerationContext(prompts, DocTree('.'), GenerationManifest(args.manifest))
+        if args.command == "export-batch":
+            load_queue(journal, args.retry_failed)
+            export_batch(journal, ctx, args.batch_file or DEFAULT_BATCH_REQUESTS_FILE)
+        else:
+            import_batch(journal, ctx, args.batch_file or DEFAULT_BATCH_RESPONSES_FILE)
+        journal.close()
+        return
+
+    # Локальний провайдер не звертається до API, тож ключ йому не потрібен
+    is_remote = args.provider != "local"
+    prompts, config_ok = check_configuration(require_api_key=is_remote)
+    if not config_ok: return
+
+    backend = build_backend(args.provider, GEMINI_API_KEYS if is_remote else [], GEMINI_MODELS or [MODEL_NAME],
+                            args.rpm, args.tpm)
+    set_backend(backend)
+    print(f"Шардів API (ключ × модель): {len(backend.shards)}.")
+    set_retry_policy(RetryPolicy(args.max_attempts))
+    # Потоків може бути більше, ніж витримує квота: регулятор зменшує кількість одночасних запитів після 429
+    set_concurrency(AdaptiveConcurrency(args.workers))
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    set_response_cache(cache, refresh=args.refresh)
+
+    journal = QueueJournal(QUEUE_JOURNAL_FILE)
+    if args.command == "run":
+        load_queue(journal, args.retry_failed)
+        if not journal.remaining():
+            print("\nЧерга обробки порожня (див. 'files_to_process.txt'). Завершення роботи.")
+            journal.close()
+            return
+        print(f"\n🚀 Початок генерації контенту. В черзі {journal.remaining()} файлів (потоків: {args.workers})...")
+
+    tree = DocTree('.')
+    telemetry = Telemetry(None if args.no_telemetry else args.telemetry_dir)
+    set_telemetry(telemetry)
+    ctx = GenerationContext(prompts, tree, GenerationManifest(args.manifest), stream=args.stream, telemetry=telemetry)
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            if args.command == "watch":
+                watch(journal, ctx, executor, args)
+            else:
+                run_queue(executor, journal, ctx, args)
+    except KeyboardInterrupt:
+        pass
+    ctx.manifest.save()
+    telemetry.close()
+    print(f"\n--- Підсумок запуску ---\n{telemetry.summary_table()}")
 
-    print("\n✅ Черга обробки порожня. Роботу завершено.")
+    failed = journal.counts()["failed"]
+    remaining = journal.remaining()
+    journal.close()
+    if failed:
+        print(f"\nФайлів з помилками: {failed}. Для повторної обробки запустіть з --retry-failed.")
+    if cache:
+        cache.evict()
+        print(f"\n{cache.stats_line()}")
+    print(backend.stats_line())
+    if remaining:
+        print(f"\n⏹ Роботу перервано. В черзі залишилось {remaining} файлів; наступний запуск продовжить з них.")
+    else:
+        print("\n✅ Черга обробки порожня. Роботу завершено.")
 
 if __name__ == "__main__":
     main()
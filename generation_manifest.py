@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import threading
+from markdown_files import write_file_atomic
+
+DEFAULT_MANIFEST_FILE = ".generation_manifest.json"
+
+
+def compute_fingerprint(prompt_type: str, master_prompt: str, front_matter: dict, user_prompt: str) -> str:
+    """
+    Відбиток усіх вхідних даних генерації сторінки: тип і майстер-промпт,
+    Front Matter та користувацький промпт (у ньому вже є заголовки підтем, а для Q&A - зміст теорії;
+    уривки змісту підтем у відбиток не входять, див. page_fingerprint).
+    """
+    payload = json.dumps({
+        'type': prompt_type,
+        'master_prompt': master_prompt,
+        'front_matter': front_matter,
+        'user_prompt': user_prompt,
+    }, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GenerationManifest:
+    """
+    Зберігає відбиток вхідних даних, з якими кожну сторінку було згенеровано востаннє.
+    Сторінка вважається застарілою, якщо запису немає або відбиток змінився.
+    """
+
+    def __init__(self, manifest_path: str = DEFAULT_MANIFEST_FILE, autosave_every: int = 50):
+        self.manifest_path = manifest_path
+        self.autosave_every = autosave_every
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._entries: dict[str, str] = {}
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f).get('pages', {})
+            except (OSError, ValueError) as e:
+                print(f"   - Не вдалося прочитати маніфест '{manifest_path}': {e}. Усі сторінки вважатимуться застарілими.")
+
+    @property
+    def is_empty(self) -> bool:
+        """Маніфесту ще немає (або він порожній): жодна сторінка не має збереженого відбитка."""
+        with self._lock:
+            return not self._entries
+
+    def is_stale(self, path: str, fingerprint: str) -> bool:
+        with self._lock:
+            return self._entries.get(os.path.normpath(path)) != fingerprint
+
+    def record(self, path: str, fingerprint: str):
+        """Запам'ятовує відбиток успішно згенерованої сторінки."""
+        with self._lock:
+            self._entries[os.path.normpath(path)] = fingerprint
+            self._unsaved += 1
+            if self._unsaved >= self.autosave_every:
+                self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        write_file_atomic(self.manifest_path,
+                          json.dumps({'pages': self._entries}, ensure_ascii=False, indent=0, sort_keys=True))
+        self._unsaved = 0
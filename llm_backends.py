@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from page_batches import BATCH_ITEM_RE
+from rate_limiter import RateLimiter
+from retry_policy import ErrorInfo
+
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+# Скільки готових клієнтів моделей (ключ, модель, системний промпт) тримати в пам'яті
+MAX_CACHED_MODELS = 64
+# Статуси, після яких шард вимикається до кінця запуску: недійсний ключ, немає доступу, невідома модель
+SHARD_DISABLING_STATUSES = {401, 403, 404}
+# Скільки помилок 5xx поспіль відправляють шард на охолодження
+MAX_CONSECUTIVE_FAILURES = 3
+# Версія google-generativeai, з якою перевірено підстановку клієнта з власним ключем у GeminiProvider.create_model
+GENAI_TESTED_VERSION = "0.8"
+
+
+class BackendUnavailable(Exception):
+    """Жоден шард не може прийняти запит (усі вимкнено)."""
+
+
+class GeminiProvider:
+    """
+    Справжній Gemini API. Кожен API-ключ отримує власний клієнт, тож шарди з різними ключами
+    працюють одночасно, не перемикаючи глобальну конфігурацію genai.
+    """
+    name = "gemini"
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client(self, api_key: str):
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                from google.ai import generativelanguage as glm
+                client = self._clients[api_key] = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            return client
+
+    def create_model(self, api_key: str, model_name: str, system_instruction: str, json_output: bool = False):
+        import google.generativeai as genai
+        model = genai.GenerativeModel(
+            model_name=model_name,
+            system_instruction=system_instruction,
+            generation_config=JSON_GENERATION_CONFIG if json_output else None
+        )
+        if api_key:
+            # Публічного способу передати ключ окремій моделі SDK не має. У google-generativeai 0.8.x
+            # GenerativeModel.__init__ задає _client = None і створює клієнт з глобальним ключем лише тоді,
+            # коли свого клієнта немає. Якщо нова версія SDK прибере цей атрибут, краще впасти одразу,
+            # ніж непомітно надсилати всі запити з глобальним ключем.
+            if not hasattr(model, "_client"):
+                raise RuntimeError(f"google-generativeai {getattr(genai, '__version__', '?')} не підтримує окремий ключ "
+                                   f"для моделі (перевірено з {GENAI_TESTED_VERSION}.x).")
+            model._client = self._client(api_key)
+        return model
+
+
+class _LocalUsage:
+    def __init__(self, prompt_tokens: int, response_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = response_tokens
+        self.total_token_count = prompt_tokens + response_tokens
+
+
+class _LocalResponse:
+    def __init__(self, text: str, usage: _LocalUsage | None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+class LocalProvider:
+    """
+    Детермінована локальна заміна API для тестів і сухих запусків: відповідь залежить лише
+    від системного та користувацького промпту. Підтримує потоковий режим і JSON-відповіді пакетних запитів.
+    Підкласи можуть імітувати затримки та помилки, перевизначивши before_request.
+    """
+    name = "local"
+
+    def __init__(self, response_chars: int = 2000):
+        self.response_chars = response_chars
+
+    def create_model(self, api_key: str, model_name: str, system_instruction: str, json_output: bool = False):
+        return _LocalModel(self, api_key, system_instruction, json_output)
+
+    def before_request(self, api_key: str) -> float:
+        """Викликається перед кожним запитом; повертає затримку відповіді в секундах або викидає помилку API."""
+        return 0.0
+
+    def text(self, system_instruction: str, prompt: str) -> str:
+        digest = hashlib.sha256(f"{system_instruction}\n{prompt}".encode('utf-8')).hexdigest()[:12]
+        line = f"Локальна відповідь {digest} для: {prompt[:80]}\n"
+        return (line * (self.response_chars // len(line) + 1))[:self.response_chars]
+
+
+class _LocalModel:
+    def __init__(self, provider: LocalProvider, api_key: str, system_instruction: str, json_output: bool = False):
+        self.provider = provider
+        self.api_key = api_key
+        self.system_instruction = system_instruction or ""
+        self.json_output = json_output
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        delay = self.provider.before_request(self.api_key)
+        if self.json_output:
+            # Пакетний запит: по сторінці на кожне завдання з промпту
+            text = json.dumps({number: self.provider.text(self.system_instruction, f"{number} {prompt}")
+                               for number in BATCH_ITEM_RE.findall(prompt)}, ensure_ascii=False)
+        else:
+            text = self.provider.text(self.system_instruction, prompt)
+        usage = _LocalUsage((len(self.system_instruction) + len(prompt)) // 3 + 1, len(text) // 3 + 1)
+        if not stream:
+            if delay:
+                time.sleep(delay)
+            return _LocalResponse(text, usage)
+        return self._stream(text, usage, delay)
+
+    @staticmethod
+    def _stream(text: str, usage: _LocalUsage, delay: float):
+        chunks = [text[i:i + 400] for i in range(0, len(text), 400)]
+        for index, chunk in enumerate(chunks):
+            if delay:
+                time.sleep(delay / len(chunks))
+            yield _LocalResponse(chunk, usage if index == len(chunks) - 1 else None)
+
+
+PROVIDERS = {"gemini": GeminiProvider, "local": LocalProvider}
+
+
+class Shard:
+    """Пара (API-ключ, модель) з власною квотою запитів і станом здоров'я."""
+
+    def __init__(self, provider, api_key: str, model_name: str, limiter: RateLimiter | None = None):
+        self.provider = provider
+        self.api_key = api_key
+        self.model_name = model_name
+        self.limiter = limiter
+        self.available_at = 0.0   # time.monotonic(), до якого шард на охолодженні
+        self.consecutive_failures = 0
+        self.disabled_reason: str | None = None
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def label(self) -> str:
+        # Ключ ніколи не виводиться повністю
+        key_hint = f"…{self.api_key[-4:]}" if self.api_key else "-"
+        return f"{self.provider.name}:{self.model_name}@{key_hint}"
+
+
+class ShardedBackend:
+    """
+    Розподіляє запити між шардами (ключ × модель) по колу, пропускаючи ті, що вичерпали
+    свою квоту RPM/TPM, перебувають на охолодженні після 429/5xx або вимкнені через недійсний ключ.
+    Для кожної комбінації (ключ, модель, системний промпт) тримає один готовий клієнт моделі.
+    """
+
+    def __init__(self, shards: list[Shard], cooldown: float = 30.0, max_cooldown: float = 300.0):
+        if not shards:
+            raise ValueError("Потрібен хоча б один шард.")
+        self.shards = shards
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._next = 0
+        self._lock = threading.Lock()
+        self._models: OrderedDict[tuple, object] = OrderedDict()
+        self._models_lock = threading.Lock()
+
+    @property
+    def model_names(self) -> list[str]:
+        return list(dict.fromkeys(shard.model_name for shard in self.shards))
+
+    def acquire(self, estimated_tokens: int = 0) -> Shard:
+        """Чекає на перший шард, що може прийняти запит, і резервує в ньому квоту."""
+        while True:
+            with self._lock:
+                active = [shard for shard in self.shards if not shard.disabled_reason]
+                if not active:
+                    reasons = "; ".join(f"{shard.label}: {shard.disabled_reason}" for shard in self.shards)
+                    raise BackendUnavailable(f"Усі шарди вимкнено ({reasons}).")
+                now = time.monotonic()
+                shortest_wait = None
+                for offset in range(len(active)):
+                    shard = active[(self._next + offset) % len(active)]
+                    wait = shard.available_at - now
+                    if wait <= 0:
+                        wait = shard.limiter.try_acquire(estimated_tokens) if shard.limiter else 0.0
+                        if wait == 0.0:
+                            self._next = (self._next + offset + 1) % len(active)
+                            shard.calls += 1
+                            return shard
+                    shortest_wait = wait if shortest_wait is None else min(shortest_wait, wait)
+            time.sleep(min(shortest_wait, 1.0))
+
+    def model(self, shard: Shard, system_prompt: str, json_output: bool = False):
+        """Повертає (і кешує) клієнт моделі шарду для системного промпту."""
+        key = (shard.api_key, shard.model_name, system_prompt, json_output)
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+        model = shard.provider.create_model(shard.api_key, shard.model_name, system_prompt, json_output)
+        with self._models_lock:
+            self._models[key] = model
+            while len(self._models) > MAX_CACHED_MODELS:
+                self._models.popitem(last=False)
+        return model
+
+    def record_usage(self, shard: Shard, estimated_tokens: int, actual_tokens: int):
+        if shard.limiter:
+            shard.limiter.record_usage(estimated_tokens, actual_tokens)
+
+    def report_success(self, shard: Shard):
+        with self._lock:
+            shard.consecutive_failures = 0
+
+    def report_failure(self, shard: Shard, error: ErrorInfo) -> bool:
+        """
+        Оновлює стан шарду після помилки: недійсний ключ чи модель вимикають шард, 429 і серія 5xx
+        відправляють його на охолодження. Повертає True, якщо шард вибув, а інший шард готовий
+        прийняти запит, тобто повторювати можна одразу, без очікування.
+        """
+        with self._lock:
+            shard.errors += 1
+            if error.status in SHARD_DISABLING_STATUSES:
+                shard.disabled_reason = f"HTTP {error.status}"
+                print(f"   - ⚠️ Шард {shard.label} вимкнено до кінця запуску (HTTP {error.status}).")
+                return self._has_ready_shard()
+            if not error.retryable:
+                return False
+            shard.consecutive_failures += 1
+            if error.is_rate_limit or shard.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                pause = error.retry_after or self.cooldown * 2 ** min(shard.consecutive_failures - 1, 4)
+                pause = min(pause, self.max_cooldown)
+                shard.available_at = max(shard.available_at, time.monotonic() + pause)
+                if len(self.shards) > 1:
+                    print(f"   - ⚠️ Шард {shard.label} на охолодженні {pause:.0f} с.")
+                return self._has_ready_shard()
+            return False
+
+    def _has_ready_shard(self) -> bool:
+        now = time.monotonic()
+        return any(not shard.disabled_reason and shard.available_at <= now for shard in self.shards)
+
+    def stats_line(self) -> str:
+        parts = []
+        for shard in self.shards:
+            state = f", вимкнено: {shard.disabled_reason}" if shard.disabled_reason else ""
+            parts.append(f"{shard.label} - запитів {shard.calls}, помилок {shard.errors}{state}")
+        return "Шарди API: " + "; ".join(parts)
+
+
+def build_backend(provider_name: str, api_keys: list[str], model_names: list[str],
+                  requests_per_minute: int | None = None, tokens_per_minute: int | None = None) -> ShardedBackend:
+    """
+    Створює бекенд із шардом на кожну пару (ключ, модель). Квоти RPM/TPM застосовуються до кожного шарду окремо,
+    бо ліміти Gemini рахуються для кожного ключа і моделі.
+    """
+    provider = PROVIDERS[provider_name]()
+    shards = [Shard(provider, api_key, model_name,
+                    RateLimiter(requests_per_minute, tokens_per_minute) if requests_per_minute or tokens_per_minute else None)
+              for api_key in (api_keys or [""]) for model_name in model_names]
+    return ShardedBackend(shards)
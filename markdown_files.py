@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import yaml
+
+# C-реалізація завантажувача YAML (libyaml) значно швидша; якщо її немає - чистий Python
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+FRONT_MATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n(.*)', re.DOTALL)
+FRONT_MATTER_DELIMITER = '---'
+PAGE_FILES = ('index.md', 'qa.md')
+# Текст-заглушка, яким script_create_structure.py заповнює нові сторінки (ще не згенеровані)
+PLACEHOLDER_TEXT = 'This is a placeholder for the content.'
+# Менші дерева швидше розібрати в одному процесі, ніж запускати пул процесів
+PARALLEL_PARSE_THRESHOLD = 2000
+
+# Кеш Front Matter: шлях -> (mtime_ns, розмір, Front Matter)
+_front_matter_cache: dict[str, tuple[int, int, dict | None]] = {}
+_front_matter_cache_lock = threading.Lock()
+
+def get_file_data(file_path: str) -> tuple[dict | None, str | None]:
+    """
+    Читає YAML Front Matter та основний контент з Markdown файлу.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            match = FRONT_MATTER_RE.search(content)
+            if match:
+                front_matter = yaml.load(match.group(1), Loader=YAML_LOADER)
+                main_content = match.group(2).strip()
+                return front_matter, main_content
+    except Exception as e:
+        print(f"   - Помилка читання файлу {file_path}: {e}")
+    return None, None
+
+def _parse_front_matter(file_path: str) -> dict | None:
+    """Читає файл лише до закриваючого '---' і розбирає YAML заголовка."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if f.readline().rstrip() != FRONT_MATTER_DELIMITER:
+            return None
+        header_lines = []
+        for line in f:
+            if line.rstrip() == FRONT_MATTER_DELIMITER:
+                front_matter = yaml.load(''.join(header_lines), Loader=YAML_LOADER)
+                return front_matter if isinstance(front_matter, dict) else None
+            header_lines.append(line)
+    # Закриваючого '---' немає - це не Front Matter
+    return None
+
+def _stat_and_parse(file_path: str) -> tuple[str, int, int, dict | None]:
+    """Розбирає Front Matter разом з ознаками версії файлу (для пулу процесів)."""
+    stat = os.stat(file_path)
+    try:
+        front_matter = _parse_front_matter(file_path)
+    except Exception as e:
+        print(f"   - Помилка читання файлу {file_path}: {e}")
+        front_matter = None
+    return file_path, stat.st_mtime_ns, stat.st_size, front_matter
+
+def read_front_matter(file_path: str) -> dict | None:
+    """
+    Повертає Front Matter файлу (або None), не читаючи основний контент.
+    Результат кешується за (шлях, mtime, розмір) і повторно не розбирається, доки файл не зміниться.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    with _front_matter_cache_lock:
+        cached = _front_matter_cache.get(file_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        front_matter = cached[2]
+    else:
+        _, mtime_ns, size, front_matter = _stat_and_parse(file_path)
+        with _front_matter_cache_lock:
+            _front_matter_cache[file_path] = (mtime_ns, size, front_matter)
+    # Копія, щоб зміни у викликаючому коді не псували кеш
+    return dict(front_matter) if front_matter is not None else None
+
+def find_page_files(root: str = '.') -> list[str]:
+    """Шляхи до всіх сторінок (index.md, qa.md) дерева, без службових і прихованих каталогів."""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(('.', '_'))]
+        for name in PAGE_FILES:
+            if name in filenames:
+                paths.append(os.path.join(dirpath, name))
+    return paths
+
+def parse_tree(root: str = '.', workers: int | None = None) -> dict[str, dict | None]:
+    """
+    Розбирає Front Matter усіх сторінок дерева і заповнює кеш read_front_matter.
+    Для великих дерев розбір розподіляється між процесами.
+    Повертає словник {шлях: Front Matter}.
+    """
+    paths = find_page_files(root)
+    stale = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        with _front_matter_cache_lock:
+            cached = _front_matter_cache.get(path)
+        if not cached or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+            stale.append(path)
+
+    if len(stale) >= PARALLEL_PARSE_THRESHOLD and workers != 1:
+        chunksize = max(1, len(stale) // ((workers or os.cpu_count() or 1) * 8))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_stat_and_parse, stale, chunksize=chunksize))
+    else:
+        results = [_stat_and_parse(path) for path in stale]
+
+    with _front_matter_cache_lock:
+        for path, mtime_ns, size, front_matter in results:
+            _front_matter_cache[path] = (mtime_ns, size, front_matter)
+
+    return {path: read_front_matter(path) for path in paths}
+
+def _create_temp_file(file_path: str) -> tuple[int, str]:
+    """
+    Створює тимчасовий файл з унікальним ім'ям у каталозі цільового (os.replace атомарний лише в межах
+    однієї файлової системи). Фіксоване ім'я на кшталт '{path}.tmp' зіткнулося б у паралельних процесах.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    return tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+
+def _copy_mode(tmp_path: str, file_path: str):
+    # mkstemp створює файл з правами 0600, а результат має бути доступний як звичайний файл
+    if os.path.exists(file_path):
+        os.chmod(tmp_path, os.stat(file_path).st_mode & 0o777)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+def write_file_atomic(file_path: str, content: str):
+    """
+    Атомарно записує текстовий файл: через тимчасовий файл з унікальним ім'ям поруч
+    і перейменування. Якщо запис не вдався, тимчасовий файл видаляється, а цільовий лишається як був.
+    """
+    fd, tmp_path = _create_temp_file(file_path)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        _copy_mode(tmp_path, file_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class AtomicPageWriter:
+    """
+    Записує сторінку у тимчасовий файл поруч із цільовим і підміняє цільовий файл
+    атомарним перейменуванням лише в commit(). Якщо запис перервано, цільовий файл
+    лишається неушкодженим, а тимчасовий видаляється.
+
+    Використання:
+        with AtomicPageWriter(path, front_matter) as writer:
+            writer.write(chunk)
+            writer.commit()
+    """
+
+    def __init__(self, file_path: str, front_matter: dict):
+        self.file_path = file_path
+        self.front_matter = front_matter
+        self._file = None
+        self._committed = False
+
+    def __enter__(self):
+        fd, self._tmp_path = _create_temp_file(self.file_path)
+        self._file = os.fdopen(fd, 'w', encoding='utf-8')
+        fm_string = yaml.dump(self.front_matter, allow_unicode=True, sort_keys=False)
+        self._file.write(f"---\n{fm_string}---\n")
+        return self
+
+    def write(self, text: str):
+        self._file.write(text)
+
+    def commit(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        _copy_mode(self._tmp_path, self.file_path)
+        os.replace(self._tmp_path, self.file_path)
+        self._committed = True
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._committed:
+            self._file.close()
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+        return False
+
+def update_file_content(file_path: str, front_matter: dict, new_content: str):
+    """
+    Перезаписує файл, зберігаючи Front Matter та додаючи новий контент.
+    Запис атомарний: збій посеред запису не залишає обрізаної сторінки.
+    """
+    with AtomicPageWriter(file_path, front_matter) as writer:
+        writer.write(new_content)
+        writer.commit()
+    print(f"   - ✅ Файл '{file_path}' успішно оновлено.")
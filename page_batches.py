@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import re
+
+# Типи промптів, які можна об'єднувати в один запит: короткі листові сторінки
+BATCHABLE_TYPES = ("topic", "faq")
+
+BATCH_INSTRUCTIONS = (
+    "Нижче наведено кілька окремих завдань. Виконай кожне з них незалежно, дотримуючись системних інструкцій, "
+    "так, ніби це окремий запит.\n"
+    "Поверни лише JSON-об'єкт без жодного тексту навколо: ключ - номер завдання з його заголовка "
+    "(наприклад \"1.2.3\"), значення - повний Markdown-текст сторінки для цього завдання.\n"
+)
+BATCH_ITEM_HEADER = '=== Завдання "{number}" ==='
+BATCH_ITEM_RE = re.compile(r'^=== Завдання "([^"]+)" ===$', re.MULTILINE)
+_JSON_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+
+def leaf_prompt_type(path: str, front_matter: dict) -> str | None:
+    """Тип промпту листової сторінки (topic для index.md без підрозділів, faq для qa.md) або None."""
+    if path.endswith('qa.md'):
+        return "faq"
+    if path.endswith('index.md') and not front_matter.get('has_children', False):
+        return "topic"
+    return None
+
+
+def group_batches(paths: list[str], prompt_types: dict[str, str | None], batch_size: int) -> list[list[str]]:
+    """
+    Розбиває чергу на одиниці роботи: сусідні листові сторінки одного типу (з одного батьківського розділу)
+    об'єднуються в пакети до batch_size сторінок, решта сторінок іде поодинці.
+    Порядок одиниць відповідає позиції їхньої першої сторінки в черзі.
+    """
+    units = []
+    open_batches: dict[tuple, list[str]] = {}
+    for path in paths:
+        prompt_type = prompt_types.get(path)
+        if batch_size < 2 or prompt_type not in BATCHABLE_TYPES:
+            units.append([path])
+            continue
+        # Каталог сторінки - це тема, її батьківський каталог - розділ, спільний для сусідніх тем
+        group = (prompt_type, os.path.dirname(os.path.dirname(path)))
+        batch = open_batches.get(group)
+        if batch is None or len(batch) >= batch_size:
+            batch = open_batches[group] = []
+            units.append(batch)
+        batch.append(path)
+    return units
+
+
+def build_batch_prompt(items: list[tuple[str, str]]) -> str:
+    """Об'єднує користувацькі промпти (номер, промпт) в один запит зі структурованою відповіддю."""
+    parts = [BATCH_INSTRUCTIONS]
+    for number, user_prompt in items:
+        parts.append(f"\n{BATCH_ITEM_HEADER.format(number=number)}\n{user_prompt}\n")
+    return "".join(parts)
+
+
+def parse_batch_response(text: str, numbers: list[str]) -> dict[str, str]:
+    """
+    Розбирає JSON-відповідь пакетного запиту. Повертає контент лише для очікуваних номерів
+    з непорожнім текстовим значенням; відсутні чи пошкоджені елементи просто не потрапляють у результат.
+    """
+    match = _JSON_FENCE_RE.match(text)
+    if match:
+        text = match.group(1)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    contents = {}
+    for key, value in data.items():
+        number = str(key).strip().rstrip('.')
+        if number in numbers and isinstance(value, str) and value.strip():
+            contents[number] = value.strip()
+    return contents
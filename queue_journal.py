@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+def normalize_path(path: str) -> str:
+    """Приводить шлях з черги до єдиного вигляду ('/a/index.md' і 'a/index.md' - один запис)."""
+    return path.strip().lstrip('/')
+
+
+class QueueJournal:
+    """
+    Журнал черги обробки на основі SQLite (режим WAL).
+    Кожен файл має стан: pending -> in_flight -> done / failed (з причиною та кількістю спроб).
+    Зміна стану одного файлу - це одна коротка транзакція, тому збій посеред роботи
+    не пошкоджує чергу, а при наступному запуску незавершені файли повертаються в pending.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                path TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                reason TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_by_state ON items(state, seq);
+        """)
+        self._next_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM items").fetchone()[0]
+        self._active = self._count_states(PENDING, IN_FLIGHT)
+
+    def _count_states(self, *states: str) -> int:
+        placeholders = ", ".join("?" for _ in states)
+        return self._conn.execute(f"SELECT COUNT(*) FROM items WHERE state IN ({placeholders})", states).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def recover(self) -> int:
+        """Повертає в чергу файли, обробку яких перервав збій. Повертає їх кількість."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = ?, updated_at = ? WHERE state = ?",
+                (PENDING, time.time(), IN_FLIGHT))
+            return cursor.rowcount
+
+    def enqueue(self, paths: list[str]) -> int:
+        """
+        Додає файли в кінець черги. Файли, що вже були оброблені (done/failed),
+        ставляться в чергу повторно; файли, що вже очікують, не дублюються.
+        """
+        added = 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for raw_path in paths:
+                    path = normalize_path(raw_path)
+                    if not path:
+                        continue
+                    row = self._conn.execute("SELECT state FROM items WHERE path = ?", (path,)).fetchone()
+                    if row and row[0] in (PENDING, IN_FLIGHT):
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO items (path, seq, state, attempts, reason, updated_at) VALUES (?, ?, ?, 0, NULL, ?) "
+                        "ON CONFLICT(path) DO UPDATE SET seq = excluded.seq, state = excluded.state, reason = NULL, "
+                        "updated_at = excluded.updated_at",
+                        (path, self._next_seq, PENDING, now))
+                    self._next_seq += 1
+                    added += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._active += added
+        return added
+
+    def requeue_failed(self) -> int:
+        """Повертає в чергу всі файли зі станом failed."""
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute("SELECT path FROM items WHERE state = ? ORDER BY seq", (FAILED,))]
+        return self.enqueue(paths)
+
+    def dequeue(self) -> str | None:
+        """Бере наступний файл з черги і позначає його як in_flight. None - черга порожня."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM items WHERE state = ? ORDER BY seq LIMIT 1", (PENDING,)).fetchone()
+            if not row:
+                return None
+            self._conn.execute(
+                "UPDATE items SET state = ?, attempts = attempts + 1, updated_at = ? WHERE path = ?",
+                (IN_FLIGHT, time.time(), row[0]))
+            return row[0]
+
+    def pending_paths(self) -> list[str]:
+        """Усі файли, що очікують обробки, у порядку черги."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT path FROM items WHERE state = ? ORDER BY seq", (PENDING,))]
+
+    def claim(self, path: str) -> bool:
+        """Позначає конкретний файл як in_flight (для планувальника, що сам обирає порядок)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = ?, attempts = attempts + 1, updated_at = ? WHERE path = ? AND state = ?",
+                (IN_FLIGHT, time.time(), normalize_path(path), PENDING))
+            return cursor.rowcount == 1
+
+    def ack(self, path: str):
+        """Позначає файл як успішно оброблений."""
+        self._finish(path, DONE, None)
+
+    def fail(self, path: str, reason: str):
+        """Позначає файл як необроблений і зберігає причину помилки."""
+        self._finish(path, FAILED, reason)
+
+    def _finish(self, path: str, state: str, reason: str | None):
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = ?, reason = ?, updated_at = ? WHERE path = ? AND state = ?",
+                (state, reason, time.time(), normalize_path(path), IN_FLIGHT))
+            self._active -= cursor.rowcount
+
+    def remaining(self) -> int:
+        """Кількість файлів, що очікують або зараз обробляються."""
+        with self._lock:
+            return self._active
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            counts = {state: 0 for state in (PENDING, IN_FLIGHT, DONE, FAILED)}
+            for state, count in self._conn.execute("SELECT state, COUNT(*) FROM items GROUP BY state"):
+                counts[state] = count
+            return counts
+
+    def failures(self) -> list[tuple[str, int, str]]:
+        """Список (шлях, кількість спроб, причина) для файлів зі станом failed."""
+        with self._lock:
+            return list(self._conn.execute(
+                "SELECT path, attempts, reason FROM items WHERE state = ? ORDER BY seq", (FAILED,)))
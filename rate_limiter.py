@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    "Кошик з токенами": вміщує до `capacity` одиниць і поповнюється
+    зі швидкістю `refill_per_sec` одиниць за секунду.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_sec)
+            self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Скільки секунд потрібно чекати, доки в кошику з'явиться `amount` одиниць."""
+        self._refill(now)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_sec
+
+    def consume(self, amount: float):
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Спільний для всіх потоків обмежувач запитів до API.
+    Контролює одночасно ліміт запитів на хвилину (RPM) та токенів на хвилину (TPM).
+    Значення `None` або 0 вимикає відповідний ліміт.
+    """
+
+    def __init__(self, requests_per_minute: int | None, tokens_per_minute: int | None = None):
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """
+        Резервує запит із `tokens` токенами, якщо він вкладається в ліміти, і повертає 0.
+        Інакше нічого не резервує і повертає, скільки секунд потрібно зачекати.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self._requests:
+                wait = max(wait, self._requests.wait_time(1, now))
+            if self._tokens:
+                # Запит, більший за весь хвилинний ліміт, інакше чекав би вічно.
+                wait = max(wait, self._tokens.wait_time(min(tokens, self._tokens.capacity), now))
+            if wait == 0.0:
+                if self._requests:
+                    self._requests.consume(1)
+                if self._tokens:
+                    self._tokens.consume(tokens)
+            return wait
+
+    def acquire(self, tokens: int = 0):
+        """Блокує потік, доки запит із `tokens` токенами не вкладеться в ліміти."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Коригує кошик токенів, коли API повідомило реальну кількість використаних токенів."""
+        if not self._tokens:
+            return
+        with self._lock:
+            self._tokens.consume(actual_tokens - estimated_tokens)
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Груба оцінка кількості токенів (для кирилиці ~3 символи на токен)."""
+    return sum(len(text) for text in texts if text) // 3 + 1
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import threading
+import time
+from markdown_files import write_file_atomic
+
+DEFAULT_CACHE_DIR = ".cache/gemini"
+DEFAULT_MAX_ENTRIES = 20_000
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024   # 500 МБ
+DEFAULT_MAX_AGE_DAYS = 90
+
+
+class ResponseCache:
+    """
+    Постійний кеш відповідей Gemini на диску.
+    Ключ - хеш від назви моделі, системного та користувацького промпту,
+    тому будь-яка зміна промпту автоматично дає новий запис.
+    Кожен запис зберігається окремим JSON-файлом; час модифікації файлу
+    оновлюється при кожному влученні і використовується для витіснення (LRU).
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name: str, system_prompt: str, user_prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model_name, system_prompt, user_prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> str | None:
+        """Повертає збережену відповідь або None, якщо запису немає чи він застарів."""
+        path = self._entry_path(key)
+        text = None
+        try:
+            if time.time() - os.path.getmtime(path) <= self.max_age_seconds:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = json.load(f).get('text')
+                os.utime(path)
+        except (OSError, ValueError):
+            text = None
+
+        with self._lock:
+            if text:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return text or None
+
+    def put(self, key: str, model_name: str, text: str):
+        """Атомарно зберігає відповідь (через тимчасовий файл і перейменування)."""
+        if not text:
+            return
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            write_file_atomic(path, json.dumps({'model': model_name, 'created_at': time.time(), 'text': text},
+                                               ensure_ascii=False))
+        except OSError as e:
+            print(f"   - Не вдалося зберегти відповідь у кеш: {e}")
+
+    def evict(self) -> int:
+        """Видаляє застарілі записи, а потім найдавніше використані, доки кеш не вкладеться в ліміти."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith('.tmp') or now - stat.st_mtime > self.max_age_seconds:
+                    os.remove(path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total_bytes -= size
+            removed += 1
+        return removed
+
+    def stats_line(self) -> str:
+        total = self.hits + self.misses
+        ratio = (self.hits / total * 100) if total else 0.0
+        return f"Кеш відповідей: влучень {self.hits}, промахів {self.misses} ({ratio:.0f}% влучень)."
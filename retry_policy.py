@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import random
+import re
+import threading
+import time
+
+# HTTP-статуси, після яких запит варто повторити
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Статуси, після яких повтор нічого не змінить (помилка в запиті, ключі чи доступі)
+PERMANENT_STATUSES = {400, 401, 403, 404}
+RATE_LIMIT_STATUS = 429
+
+_STATUS_RE = re.compile(r'^\s*(\d{3})\b')
+# Підказки про час очікування в повідомленнях Gemini API:
+#   "retry_delay { seconds: 27 }" або "Please retry in 27.5s"
+_RETRY_DELAY_RE = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE)
+_RETRY_IN_RE = re.compile(r'retry in\s*([\d.]+)\s*s', re.IGNORECASE)
+
+
+class ErrorInfo:
+    """Результат класифікації помилки виклику API."""
+
+    def __init__(self, retryable: bool, status: int | None, retry_after: float | None):
+        self.retryable = retryable
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def is_rate_limit(self) -> bool:
+        return self.status == RATE_LIMIT_STATUS
+
+
+def classify_error(error: Exception) -> ErrorInfo:
+    """
+    Визначає, чи можна повторити запит після помилки, її HTTP-статус і підказку retry-after.
+    Розпізнає винятки google.api_core (атрибут code) та статус на початку повідомлення.
+    """
+    message = str(error)
+    status = getattr(error, 'code', None)
+    if not isinstance(status, int):
+        match = _STATUS_RE.match(message)
+        status = int(match.group(1)) if match else None
+
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is None:
+        match = _RETRY_DELAY_RE.search(message) or _RETRY_IN_RE.search(message)
+        retry_after = float(match.group(1)) if match else None
+
+    if status in RETRYABLE_STATUSES:
+        retryable = True
+    elif status in PERMANENT_STATUSES:
+        retryable = False
+    else:
+        # Мережеві збої без HTTP-статусу теж тимчасові
+        retryable = isinstance(error, (TimeoutError, ConnectionError))
+    return ErrorInfo(retryable, status, retry_after)
+
+
+class RetryPolicy:
+    """Експоненційна затримка з повним джитером (full jitter), обмежена зверху `max_delay`."""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random()
+
+    def delay(self, attempt: int, error: ErrorInfo) -> float:
+        """Затримка перед повтором номер `attempt` (з 1); підказка retry-after від API має пріоритет."""
+        backoff = self._random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if error.retry_after is not None:
+            # Невеликий джитер, щоб потоки, які отримали однакову підказку, не повернулися одночасно
+            return min(self.max_delay, error.retry_after) + self._random.uniform(0, self.base_delay)
+        return backoff
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD-регулятор кількості одночасних запитів до API.
+    Кожен успіх збільшує ліміт на 1/ліміт (тобто приблизно +1 за "раунд" запитів),
+    кожна відповідь 429 зменшує ліміт удвічі (не частіше за раз на `cooldown` секунд,
+    щоб одна хвиля відмов не обвалила ліміт до мінімуму).
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease_factor: float = 0.5, cooldown: float = 5.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.limit = float(self.max_limit)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Чекає, доки кількість запитів у роботі стане меншою за поточний ліміт."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def on_success(self):
+        with self._cond:
+            previous = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if int(self.limit) > previous:
+                self._cond.notify()
+
+    def on_throttle(self):
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            print(f"   - ⚠️ API обмежує запити (429): одночасних запитів тепер не більше {int(self.limit)}.")
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import heapq
+import os
+import threading
+from doc_tree import DocTree
+
+# Як часто потік, що чекає на готовий файл, перевіряє подію зупинки (секунди)
+STOP_POLL_INTERVAL = 0.5
+
+
+def build_dependencies(paths: list[str], tree: DocTree) -> dict[str, set[str]]:
+    """
+    Будує залежності між файлами черги за структурою дерева документації:
+    - index.md з підрозділами чекає на index.md своїх підрозділів, що стоять у черзі;
+    - qa.md чекає на index.md у тому ж каталозі, якщо той теж у черзі.
+    """
+    queued = {os.path.normpath(path): path for path in paths}
+    dependencies = {path: set() for path in paths}
+    for key, path in queued.items():
+        if os.path.basename(key) == 'qa.md':
+            sibling = os.path.join(os.path.dirname(key), 'index.md')
+            if sibling in queued:
+                dependencies[path].add(queued[sibling])
+            continue
+        node = tree.get(key)
+        if node and node.has_children:
+            dependencies[path].update(queued[child] for child in node.children if child in queued)
+    return dependencies
+
+
+class DagScheduler:
+    """
+    Видає файли для обробки так, щоб кожен файл стартував лише після завершення
+    всіх його залежностей. Незалежні файли видаються одразу, тож їх можна обробляти паралельно.
+    Серед готових файлів першими йдуть найглибші - вони розблоковують найдовші ланцюжки.
+    Після події stop next() більше не видає файлів.
+    """
+
+    def __init__(self, paths: list[str], dependencies: dict[str, set[str]], stop: threading.Event | None = None):
+        self._cond = threading.Condition()
+        self._stop = stop
+        self._order = {path: index for index, path in enumerate(paths)}
+        self._waiting = {path: len(deps) for path, deps in dependencies.items()}
+        self._dependents: dict[str, list[str]] = {path: [] for path in paths}
+        for path, deps in dependencies.items():
+            for dep in deps:
+                self._dependents[dep].append(path)
+        self._ready = []
+        self._unfinished = len(paths)
+        for path in paths:
+            if self._waiting[path] == 0:
+                self._push(path)
+
+    def _push(self, path: str):
+        depth = path.strip('/').count('/')
+        heapq.heappush(self._ready, (-depth, self._order[path], path))
+
+    def next(self) -> str | None:
+        """Повертає наступний готовий файл, чекаючи за потреби. None - усі файли видано або надійшла зупинка."""
+        with self._cond:
+            while True:
+                if self._stop is not None and self._stop.is_set():
+                    return None
+                if self._ready:
+                    return heapq.heappop(self._ready)[2]
+                if self._unfinished == 0:
+                    return None
+                # Зупинку перевіряємо періодично: подію встановлює інший потік, який не знає про планувальник
+                self._cond.wait(STOP_POLL_INTERVAL)
+
+    def done(self, path: str):
+        """Позначає файл завершеним (успішно чи ні) і розблоковує залежні від нього."""
+        with self._cond:
+            self._unfinished -= 1
+            for dependent in self._dependents[path]:
+                self._waiting[dependent] -= 1
+                if self._waiting[dependent] == 0:
+                    self._push(dependent)
+            self._cond.notify_all()
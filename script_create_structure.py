@@ -7,143 +7,379 @@ import os
 import re
 # shutil: для операцій з файлами високого рівня (наприклад, видалення дерев каталогів)
 import shutil
+# argparse: для розбору аргументів командного рядка (--dry-run)
+import argparse
+# json: для маніфесту каталогів, створених цим скриптом
+import json
+# Counter: для підрахунку однакових назв у структурі
+from collections import Counter
+# yaml: для формування Front Matter сторінок з уже згенерованим контентом
+import yaml
 # slugify: для перетворення тексту в URL-сумісний формат (напр. "Привіт Світ" -> "privit-svit")
 from slugify import slugify
+# Спільні функції читання Markdown-сторінок (повністю та лише Front Matter) і текст-заглушка нових сторінок
+from markdown_files import PLACEHOLDER_TEXT, get_file_data, read_front_matter, write_file_atomic
 
-def clean_generated_folders(base_path='.'):
-    """
-    Очищує раніше згенеровані папки.
-    Це потрібно, щоб уникнути конфліктів та застарілих файлів при повторному запуску скрипту.
-    Функція читає `content.md` і видаляє папки, що відповідають його структурі.
+# Регулярні вирази компілюються один раз, а не на кожному рядку
+# Рядок структури: "1.2.3 Назва розділу"
+OUTLINE_LINE_RE = re.compile(r'^(\d+(\.\d+)*)\s+(.+)')
+# Номер на початку заголовка сторінки: "1.2.3 ..." -> "1.2.3"
+TITLE_NUMBER_RE = re.compile(r'^(\d+(?:\.\d+)*)\.?\s*')
+
+# Список каталогів, створених цим скриптом: лише їх можна переміщувати та видаляти
+STRUCTURE_MANIFEST_FILE = '.structure_manifest.json'
+# Ключі Front Matter, якими керує цей скрипт. Інші ключі на сторінці не чіпаємо.
+MANAGED_KEYS = ('layout', 'title', 'parent', 'nav_order', 'has_children')
+
+HOME_PAGE = (
+    '---\n'
+    'layout: home\n'
+    'title: Home\n'
+    'nav_order: 1\n'
+    '---\n\n'
+    '# Welcome to the Documentation\n\n'
+    'Select a topic from the navigation to get started.\n'
+)
+
+def parse_outline(lines, base_path='.'):
     """
-    # Перевірка, чи існує файл `content.md`. Якщо ні, очищення не потрібне.
-    if not os.path.exists('content.md'):
-        print("Файл content.md не знайдено. Очищення не потрібне.")
-        return
-        
-    print("Запускаю очищення раніше згенерованих каталогів...")
-    # Відкриваємо `content.md` для читання
-    with open('content.md', 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+    Розбирає рядки `content.md` за один прохід і повертає список елементів структури
+    у порядку документа (батьківський елемент завжди йде перед дочірніми).
+
+    Замість рекурсії з копіюванням залишку списку (`lines[i:]`) використовується стек
+    "відкритих" розділів: для кожного рядка зі стеку знімаються всі елементи того ж
+    або глибшого рівня, і на вершині лишається найближчий батьківський розділ.
 
-    # Проходимо по кожному рядку файлу
+    :param lines: Рядки файлу `content.md`.
+    :param base_path: Кореневий каталог, у якому створюється структура.
+    :return: Список словників з ключами number, title, level, path, parent_title, has_children.
+    """
+    entries = []
+    stack = []
     for line in lines:
-        # Шукаємо рядки, що відповідають формату "1.2.3 Назва розділу"
-        match = re.match(r'^(\d+(\.\d+)*)\s+(.+)', line)
-        if match:
-            # Витягуємо назву розділу
-            title = match.group(3).strip()
-            # Перетворюємо назву на безпечне ім'я для папки
-            folder_name = slugify(title)
-            # Ми видаляємо тільки папки верхнього рівня, оскільки скрипт створює їх з нуля.
-            # Це перевіряється по наявності крапки в номері (напр. "1" - верхній рівень, "1.1" - ні).
-            if '.' not in match.group(1):
-                path_to_remove = os.path.join(base_path, folder_name)
-                # Якщо така папка існує, видаляємо її рекурсивно
-                if os.path.isdir(path_to_remove):
-                    shutil.rmtree(path_to_remove)
-                    print(f"Видалено каталог: {path_to_remove}")
-    print("Очищення завершено.")
-
-def create_structure(lines, parent_path='.', parent_title='Home', level=1):
-    """
-    Рекурсивно створює структуру каталогів та файли `index.md`.
-    Функція обробляє список рядків з `content.md` і для кожного створює
-    відповідну папку та файл `index.md` з необхідною службовою інформацією (Jekyll Front Matter).
-    
-    :param lines: Список рядків, що залишилися для обробки.
-    :param parent_path: Шлях до батьківського каталогу.
-    :param parent_title: Назва батьківського розділу для навігації.
-    :param level: Поточний рівень вкладеності (1 для кореневих розділів).
-    :return: Кількість оброблених рядків.
-    """
-    i = 0
-    # Цикл проходить по рядках, доки вони не закінчаться
-    while i < len(lines):
-        line = lines[i]
-        
-        # Визначаємо рівень вкладеності поточного елемента за його номером
-        match = re.match(r'^(\d+(\.\d+)*)\s+(.+)', line)
+        match = OUTLINE_LINE_RE.match(line)
         if not match:
             # Якщо рядок не відповідає формату, ігноруємо його
-            i += 1
             continue
-            
-        current_level_str = match.group(1)
-        current_level = len(current_level_str.split('.'))
-        
-        # Якщо поточний рівень менший за очікуваний, це означає, що ми повернулися
-        # на рівень вище, тому потрібно завершити рекурсивний виклик.
-        if current_level < level:
-            return i 
-
-        # Якщо поточний рівень більший, це означає, що це дочірній елемент.
-        # Ми викликаємо цю ж функцію рекурсивно для обробки вкладеної структури.
-        if current_level > level:
-            # `lines[i:]` передає залишок списку в рекурсію.
-            lines_processed = create_structure(lines[i:], current_path, title, level + 1)
-            # Пропускаємо рядки, які були оброблені в рекурсивному виклику.
-            i += lines_processed
+
+        number = match.group(1)
+        level = len(number.split('.'))
+        title = match.group(3).strip()
+
+        # Повертаємося на потрібний рівень: батьком є останній елемент меншого рівня
+        while stack and stack[-1]['level'] >= level:
+            stack.pop()
+        parent = stack[-1] if stack else None
+        if parent:
+            # Прапорець потрібен Jekyll-темі, щоб відобразити стрілочку для розгортання меню
+            parent['has_children'] = True
+
+        entry = {
+            'number': number,
+            'title': title,
+            'level': level,
+            'path': os.path.join(parent['path'] if parent else base_path, slugify(title)),
+            'parent_title': parent['title'] if parent else 'Home',
+            'has_children': False,
+        }
+        entries.append(entry)
+        stack.append(entry)
+    return entries
+
+def desired_front_matter(entry):
+    """Службова інформація Jekyll (Front Matter), яку повинна мати сторінка елемента."""
+    front_matter = {
+        'layout': 'default',                # Шаблон сторінки
+        'title': entry['title'],            # Заголовок сторінки
+        'parent': entry['parent_title'],    # Батьківський елемент для навігації
+        # Остання цифра з номера (напр. з "1.2.3" беремо "3") для сортування
+        'nav_order': int(entry['number'].split('.')[-1]),
+    }
+    if entry['has_children']:
+        front_matter['has_children'] = True
+    return front_matter
+
+def placeholder_page(entry):
+    """Вміст нової сторінки: Front Matter, заголовок і текст-заглушка."""
+    front_matter = desired_front_matter(entry)
+    page = '---\n'
+    page += f"layout: {front_matter['layout']}\n"
+    page += f"title: {front_matter['title']}\n"
+    page += f"parent: {front_matter['parent']}\n"
+    page += f"nav_order: {front_matter['nav_order']}\n"
+    if front_matter.get('has_children'):
+        page += 'has_children: true\n'
+    page += '---\n\n'
+    page += f"# {entry['title']}\n\n"
+    page += f'{PLACEHOLDER_TEXT}\n'
+    return page
+
+def title_key(title):
+    """Назва розділу без номера - за нею впізнаємо розділ, який перенумерували або перенесли."""
+    return TITLE_NUMBER_RE.sub('', str(title)).strip().lower()
+
+def load_structure_manifest(base_path='.'):
+    """
+    Повертає множину каталогів, створених цим скриптом під час попередньої синхронізації,
+    або None, якщо маніфесту ще немає.
+    """
+    try:
+        with open(os.path.join(base_path, STRUCTURE_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            paths = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {os.path.normpath(os.path.join(base_path, path)) for path in paths}
+
+def save_structure_manifest(entries, base_path='.'):
+    """Записує в маніфест каталоги всіх елементів структури (шляхи відносно base_path)."""
+    paths = sorted(os.path.relpath(entry['path'], base_path) for entry in entries)
+    write_page(os.path.join(base_path, STRUCTURE_MANIFEST_FILE), json.dumps(paths, ensure_ascii=False, indent=1) + '\n')
+
+def owned_paths(entries, base_path='.'):
+    """
+    Визначає, якими каталогами керує скрипт. Якщо маніфест є - лише записаними в ньому.
+    Інакше (перший запуск) - каталогами розділів верхнього рівня з `content.md` та всім, що в них вкладено,
+    як і раніше, коли ці розділи щоразу видалялися й створювалися наново.
+    Повертає функцію, що перевіряє шлях каталогу.
+    """
+    manifest = load_structure_manifest(base_path)
+    if manifest is not None:
+        return lambda path: path in manifest
+    roots = [os.path.normpath(entry['path']) for entry in entries if entry['level'] == 1]
+    return lambda path: any(path == root or path.startswith(root + os.sep) for root in roots)
+
+def scan_existing(base_path='.', is_owned=None):
+    """
+    Знаходить на диску раніше згенеровані каталоги - ті, що містять `index.md`
+    із заголовком і батьківським елементом у Front Matter (саме так їх створює цей скрипт).
+    Якщо передано is_owned, враховуються лише каталоги, якими керує скрипт (див. owned_paths):
+    сторінки, написані вручну, ніколи не переміщуються і не видаляються.
+    Повертає словник {шлях до каталогу: Front Matter}.
+    """
+    existing = {}
+    for dirpath, dirnames, filenames in os.walk(base_path):
+        # Службові каталоги Jekyll та приховані каталоги не чіпаємо
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(('.', '_')))
+        path = os.path.normpath(dirpath)
+        if path == os.path.normpath(base_path) or 'index.md' not in filenames:
+            continue
+        if is_owned is not None and not is_owned(path):
+            continue
+        front_matter = read_front_matter(os.path.join(dirpath, 'index.md'))
+        if front_matter and front_matter.get('title') and 'parent' in front_matter:
+            existing[path] = front_matter
+    return existing
+
+def plan_changes(entries, existing, base_path='.'):
+    """
+    Порівнює цільову структуру з диском і повертає список операцій:
+    ('mkdir', шлях), ('move', звідки, куди), ('write', шлях до index.md, вміст), ('remove', шлях).
+    Сторінки, які вже відповідають структурі, не потрапляють у план.
+    """
+    operations = []
+    # Де зараз (з урахуванням запланованих переміщень) знаходиться кожен існуючий каталог.
+    # Ключ - шлях каталогу на диску до початку змін.
+    location = {path: path for path in existing}
+    at_location = dict(location)
+    claimed = set()
+
+    # Індекси для пошуку перенесених каталогів: за (батьківський розділ, назва), за назвою та за номером
+    by_parent_title = {}
+    by_title = {}
+    by_number = {}
+    for path, front_matter in existing.items():
+        title = str(front_matter.get('title', ''))
+        by_parent_title.setdefault((title_key(front_matter.get('parent', '')), title_key(title)), []).append(path)
+        by_title.setdefault(title_key(title), []).append(path)
+        number_match = TITLE_NUMBER_RE.match(title)
+        if number_match:
+            by_number.setdefault(number_match.group(1), []).append(path)
+    outline_titles = Counter(title_key(entry['title']) for entry in entries)
+
+    def same_parent_and_title(entry):
+        return by_parent_title.get((title_key(entry['parent_title']), title_key(entry['title'])), [])
+
+    def unique_title(entry):
+        # Назви на кшталт "Вступ" повторюються в різних розділах: лише за назвою зіставляємо,
+        # коли вона єдина і в структурі, і на диску
+        key = title_key(entry['title'])
+        candidates = by_title.get(key, [])
+        return candidates if len(candidates) == 1 and outline_titles[key] == 1 else []
+
+    # 1. Каталоги, що вже лежать на своєму місці, лишаються там
+    assigned = {}
+    for index, entry in enumerate(entries):
+        path = os.path.normpath(entry['path'])
+        if path in existing:
+            assigned[index] = path
+            claimed.add(path)
+
+    # 2. Для решти шукаємо перенесений каталог: спершу за назвою без номера в тому самому батьківському
+    #    розділі (перенумерація), потім за унікальною назвою (перенесення в інший розділ) для всіх елементів,
+    #    і лише потім за номером (перейменування)
+    for lookup in (same_parent_and_title, unique_title, lambda e: by_number.get(e['number'], [])):
+        for index, entry in enumerate(entries):
+            if index in assigned:
+                continue
+            for original in lookup(entry):
+                if original not in claimed:
+                    assigned[index] = original
+                    claimed.add(original)
+                    break
+
+    # 3. Проходимо структуру згори донизу: переміщуємо, створюємо та оновлюємо сторінки
+    for index, entry in enumerate(entries):
+        path = os.path.normpath(entry['path'])
+        original = assigned.get(index)
+        if not original and at_location.get(path) not in (None, *claimed):
+            # Каталог уже опинився на потрібному місці разом з переміщеним батьківським каталогом
+            original = at_location[path]
+            claimed.add(original)
+        if original and location[original] != path:
+            source = location[original]
+            operations.append(('move', source, path))
+            # Разом з каталогом переміщуються всі вкладені каталоги
+            for moved, current in list(location.items()):
+                if current == source or current.startswith(source + os.sep):
+                    location[moved] = path + current[len(source):]
+            at_location = {current: moved for moved, current in location.items()}
+        elif not original and not os.path.isdir(path):
+            operations.append(('mkdir', path))
+
+        # Файл читаємо з його фактичного (до змін) розташування
+        current_index_path = os.path.join(original if original else path, 'index.md')
+        new_content = render_page(entry, current_index_path)
+        if new_content is not None:
+            operations.append(('write', os.path.join(path, 'index.md'), new_content))
+
+    # 4. Каталоги, яких більше немає в структурі, видаляємо (вкладені - разом з батьківським)
+    removed = []
+    leftovers = sorted((path for path in existing if path not in claimed),
+                       key=lambda p: (location[p].count(os.sep), location[p]))
+    for original in leftovers:
+        path = location[original]
+        if any(path.startswith(parent + os.sep) for parent in removed):
+            continue
+        # План будується до змін, тож вміст каталогу перевіряємо за його початковим шляхом
+        if foreign_pages(original, existing):
+            print(f"Каталог '{path}' не видалено: у ньому є сторінки, створені не цим скриптом.")
             continue
+        removed.append(path)
+        operations.append(('remove', path))
 
-        # --- ОБРОБКА ЕЛЕМЕНТА ПОТОЧНОГО РІВНЯ ---
+    # 5. Головна сторінка сайту
+    home_path = os.path.join(base_path, 'index.md')
+    if read_bytes(home_path) != HOME_PAGE.encode('utf-8'):
+        operations.append(('write', home_path, HOME_PAGE))
+    return operations
 
-        # Витягуємо назву і створюємо slug (ім'я для папки/URL)
-        title = match.group(3).strip()
-        slug = slugify(title)
-        # Формуємо повний шлях до нового каталогу
-        current_path = os.path.join(parent_path, slug)
-        
-        # Створюємо каталог, якщо він ще не існує
-        os.makedirs(current_path, exist_ok=True)
-        
-        # Шлях до файлу index.md всередині нового каталогу
-        index_path = os.path.join(current_path, 'index.md')
-        
-        # Перевіряємо, чи є у цього елемента дочірні.
-        # Це потрібно для Jekyll-теми, щоб відобразити стрілочку для розгортання меню.
-        has_children = False
-        if i + 1 < len(lines): # Перевіряємо, чи є наступний рядок
-            next_line = lines[i+1]
-            next_match = re.match(r'^(\d+(\.\d+)*)', next_line)
-            if next_match:
-                # Якщо рівень наступного елемента більший, значить, поточний має дочірні
-                next_level = len(next_match.group(1).split('.'))
-                if next_level > level:
-                    has_children = True
-
-        # Створюємо файл index.md та записуємо в нього службову інформацію Jekyll (Front Matter)
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write('---\n')
-            f.write('layout: default\n')             # Шаблон сторінки
-            f.write(f'title: {title}\n')             # Заголовок сторінки
-            f.write(f'parent: {parent_title}\n')     # Батьківський елемент для навігації
-            
-            # Витягуємо останню цифру з номера (напр. з "1.2.3" беремо "3") для сортування
-            nav_order = current_level_str.split('.')[-1]
-            f.write(f'nav_order: {nav_order}\n')
-            
-            # Якщо є дочірні елементи, додаємо відповідний прапорець
-            if has_children:
-                f.write('has_children: true\n')
-                
-            f.write('---\n\n') # Кінець Front Matter
-            # Додаємо основний заголовок на сторінку
-            f.write(f'# {title}\n\n')
-            f.write('This is a placeholder for the content.\n') # Тимчасовий текст-заглушка
-        
-        i += 1
-    
-    return i # Повертаємо кількість оброблених рядків
-
-def main():
+def foreign_pages(path, known_paths):
+    """Каталоги з `index.md` всередині path, яких немає серед каталогів, керованих скриптом."""
+    foreign = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        if 'index.md' in filenames and os.path.normpath(dirpath) not in known_paths:
+            foreign.append(os.path.normpath(dirpath))
+    return foreign
+
+def read_bytes(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def render_page(entry, existing_index_path):
+    """
+    Повертає новий вміст `index.md` або None, якщо сторінку переписувати не потрібно.
+    Згенерований контент сторінки зберігається - оновлюється лише Front Matter.
+
+    :param existing_index_path: Поточний (до змін) шлях до `index.md` елемента.
+    """
+    placeholder = placeholder_page(entry)
+    if not os.path.exists(existing_index_path):
+        return placeholder
+
+    # Найчастіший випадок - сторінка збігається з шаблоном байт у байт, розбирати YAML не потрібно
+    if read_bytes(existing_index_path) == placeholder.encode('utf-8'):
+        return None
+
+    front_matter, body = get_file_data(existing_index_path)
+    if front_matter is None or body is None or PLACEHOLDER_TEXT in body:
+        # Сторінка ще не згенерована: перезаписуємо її за шаблоном
+        return placeholder
+
+    desired = desired_front_matter(entry)
+    if all(str(front_matter.get(key)) == str(desired.get(key)) for key in MANAGED_KEYS):
+        return None
+    merged = {key: value for key, value in front_matter.items() if key not in MANAGED_KEYS}
+    merged = {**desired, **merged}
+    fm_string = yaml.dump(merged, allow_unicode=True, sort_keys=False)
+    return f"---\n{fm_string}---\n{body}"
+
+def apply_changes(operations):
+    """Виконує операції плану по черзі. Повертає список змінених файлів і каталогів."""
+    changed = []
+    for operation in operations:
+        kind = operation[0]
+        if kind == 'mkdir':
+            os.makedirs(operation[1], exist_ok=True)
+        elif kind == 'move':
+            os.makedirs(os.path.dirname(operation[2]) or '.', exist_ok=True)
+            shutil.move(operation[1], operation[2])
+            changed.extend([operation[1], operation[2]])
+        elif kind == 'write':
+            write_page(operation[1], operation[2])
+            changed.append(operation[1])
+        elif kind == 'remove':
+            shutil.rmtree(operation[1])
+            changed.append(operation[1])
+    return changed
+
+def write_page(path, content):
+    """Атомарно записує сторінку: через тимчасовий файл з унікальним ім'ям і перейменування."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_file_atomic(path, content)
+
+def print_changes(operations):
+    """Виводить план змін у зрозумілому вигляді (для --dry-run)."""
+    labels = {'mkdir': '+ створити каталог', 'move': '→ перемістити', 'write': '~ записати', 'remove': '- видалити'}
+    for operation in operations:
+        if operation[0] == 'move':
+            print(f"{labels['move']}: {operation[1]} -> {operation[2]}")
+        else:
+            print(f"{labels[operation[0]]}: {operation[1]}")
+
+def sync_structure(lines, base_path='.', dry_run=False):
+    """
+    Приводить структуру каталогів на диску у відповідність до `content.md`.
+    Повертає список змінених шляхів (порожній при dry_run).
+    """
+    entries = parse_outline(lines, base_path)
+    operations = plan_changes(entries, scan_existing(base_path, owned_paths(entries, base_path)), base_path)
+    if not operations:
+        if not dry_run:
+            save_structure_manifest(entries, base_path)
+        print("Структура вже актуальна, змін немає.")
+        return []
+    print_changes(operations)
+    if dry_run:
+        print(f"Пробний запуск: заплановано {len(operations)} змін, на диск нічого не записано.")
+        return []
+    changed = apply_changes(operations)
+    save_structure_manifest(entries, base_path)
+    print(f"Структуру оновлено: виконано {len(operations)} змін.")
+    return changed
+
+def main(argv=None):
     """
     Головна функція, яка керує виконанням скрипту.
     """
-    # 1. Спершу очищуємо старі згенеровані папки
-    clean_generated_folders()
+    parser = argparse.ArgumentParser(description="Створює та оновлює структуру документації за файлом content.md.")
+    parser.add_argument('--dry-run', action='store_true', help="Лише показати заплановані зміни, нічого не змінюючи.")
+    args = parser.parse_args(argv)
 
-    # 2. Намагаємося прочитати файл `content.md`
+    # 1. Намагаємося прочитати файл `content.md`
     try:
         with open('content.md', 'r', encoding='utf-8') as f:
             lines = f.readlines()
@@ -151,19 +387,8 @@ def main():
         print("Помилка: файл content.md не знайдено. Будь ласка, створіть цей файл зі структурою документації.")
         return
 
-    # 3. Створюємо кореневий файл index.md для сайту (головна сторінка)
-    with open('index.md', 'w', encoding='utf-8') as f:
-        f.write('---\n')
-        f.write('layout: home\n')
-        f.write('title: Home\n')
-        f.write('nav_order: 1\n')
-        f.write('---\n\n')
-        f.write('# Welcome to the Documentation\n\n')
-        f.write('Select a topic from the navigation to get started.\n')
-        
-    # 4. Запускаємо рекурсивний процес створення структури
-    create_structure(lines)
-    print("Структура каталогів та файли index.md успішно створені.")
+    # 2. Порівнюємо цільову структуру з диском і змінюємо лише те, що відрізняється
+    sync_structure(lines, dry_run=args.dry_run)
 
 # Цей блок виконується тільки тоді, коли скрипт запускається напряму
 if __name__ == '__main__':
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Побудова попередньо зібраного пошукового індексу сайту, розбитого на шарди за розділами.
+
+Замість одного великого search-data.json, з якого браузер будує індекс lunr при першому пошуку,
+скрипт рахує компактний інвертований індекс заздалегідь: один JSON-шард на кожен розділ верхнього рівня
+та маніфест із фільтрами Блума за префіксами термів. Браузер (assets/js/search-shards.js) спершу
+завантажує шард поточного розділу, а інші - лише тоді, коли фільтр показує, що в них є терми запиту.
+
+Приклад:
+    python search_index.py --output assets/js/search
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import re
+import yaml
+from markdown_files import YAML_LOADER, find_page_files, get_file_data, write_file_atomic
+
+CONFIG_FILE = "_config.yml"
+DEFAULT_OUTPUT_DIR = os.path.join("assets", "js", "search")
+MANIFEST_FILE = "manifest.json"
+# Роздільник за замовчуванням у just-the-docs, якщо в _config.yml його не задано
+DEFAULT_SEPARATOR = r"[\s\-/]+"
+ROOT_SHARD = "_root"
+# Збіг у заголовку важить більше, ніж у тексті сторінки
+TITLE_BOOST = 10
+# Фільтр Блума шарду містить усі префікси термів до цієї довжини
+BLOOM_PREFIX_CHARS = 4
+BLOOM_BITS_PER_KEY = 10   # ~1% хибних спрацювань при 7 хеш-функціях
+BLOOM_HASHES = 7
+
+_TRIM_RE = re.compile(r'^\W+|\W+$')
+_MARKDOWN_NOISE_RE = [
+    (re.compile(r'\{%.*?%\}|\{\{.*?\}\}', re.DOTALL), ' '),     # Liquid
+    (re.compile(r'<[^>]+>'), ' '),                               # HTML-теги
+    (re.compile(r'!?\[([^\]]*)\]\([^)]*\)'), r'\1'),             # посилання та зображення -> текст
+    (re.compile(r'^\s*(```|~~~).*$', re.MULTILINE), ' '),        # огорожі блоків коду (сам код індексується)
+]
+
+
+def load_site_config(config_path: str = CONFIG_FILE) -> dict:
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=YAML_LOADER) or {}
+
+
+def separator_pattern(config: dict) -> str:
+    """Регулярний вираз роздільника з search_tokenizer_separator (у _config.yml він записаний як JS-літерал /.../)."""
+    separator = str(config.get('search_tokenizer_separator') or DEFAULT_SEPARATOR).strip()
+    if len(separator) > 1 and separator.startswith('/') and separator.endswith('/'):
+        separator = separator[1:-1]
+    return separator
+
+
+def tokenize(text: str, separator: re.Pattern) -> list[str]:
+    """Ділить текст на терми так само, як lunr у just-the-docs: роздільник, обрізання неслівних символів, нижній регістр."""
+    tokens = []
+    for raw in separator.split(text.lower()):
+        token = _TRIM_RE.sub('', raw)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def strip_markdown(text: str) -> str:
+    for pattern, replacement in _MARKDOWN_NOISE_RE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def page_url(path: str) -> str:
+    """Відносна адреса сторінки на сайті Jekyll (без baseurl)."""
+    directory, name = os.path.split(path)
+    url = '/' + directory.replace(os.sep, '/') + '/' if directory else '/'
+    return url if name == 'index.md' else f"{url}{os.path.splitext(name)[0]}.html"
+
+
+def _fnv1a(data: bytes, seed: int) -> int:
+    value = seed
+    for byte in data:
+        value = ((value ^ byte) * 16777619) & 0xFFFFFFFF
+    return value
+
+
+def bloom_positions(key: str, bits: int) -> list[int]:
+    """Позиції ключа у фільтрі Блума (подвійне хешування FNV-1a; та сама формула в search-shards.js)."""
+    data = key.encode('utf-8')
+    h1 = _fnv1a(data, 2166136261)
+    h2 = _fnv1a(data, 0x5BD1E995) | 1
+    return [((h1 + i * h2) & 0xFFFFFFFF) % bits for i in range(BLOOM_HASHES)]
+
+
+def build_bloom(terms: list[str]) -> tuple[int, str]:
+    """Фільтр Блума за префіксами термів; повертає (кількість біт, біти у base64)."""
+    keys = {term[:length] for term in terms for length in range(1, min(len(term), BLOOM_PREFIX_CHARS) + 1)}
+    bits = max(64, math.ceil(len(keys) * BLOOM_BITS_PER_KEY / 8) * 8)
+    bitmap = bytearray(bits // 8)
+    for key in keys:
+        for position in bloom_positions(key, bits):
+            bitmap[position >> 3] |= 1 << (position & 7)
+    return bits, base64.b64encode(bytes(bitmap)).decode('ascii')
+
+
+def collect_pages(root: str, config: dict, separator: re.Pattern) -> dict[str, list[dict]]:
+    """Збирає сторінки дерева, згруповані за розділом верхнього рівня."""
+    excluded = {str(item).strip('/') for item in config.get('exclude', [])}
+    shards: dict[str, list[dict]] = {}
+    for page_path in sorted(find_page_files(root)):
+        relative = os.path.normpath(os.path.relpath(page_path, root))
+        parts = relative.split(os.sep)
+        if parts[0] in excluded:
+            continue
+        front_matter, body = get_file_data(page_path)
+        if not front_matter or front_matter.get('search_exclude'):
+            continue
+        title = str(front_matter.get('title', ''))
+        terms: dict[str, int] = {}
+        for token in tokenize(title, separator):
+            terms[token] = terms.get(token, 0) + TITLE_BOOST
+        for token in tokenize(strip_markdown(body or ''), separator):
+            terms[token] = terms.get(token, 0) + 1
+        shard = parts[0] if len(parts) > 1 else ROOT_SHARD
+        shards.setdefault(shard, []).append({
+            'url': page_url(relative),
+            'title': title,
+            'parent': str(front_matter.get('parent', '')),
+            'terms': terms,
+            'is_section': len(parts) == 2 and parts[1] == 'index.md',
+        })
+    return shards
+
+
+def build_shard(pages: list[dict]) -> dict:
+    """Інвертований індекс шарду: відсортовані терми і для кожного - плоский список [документ, вага, ...]."""
+    postings: dict[str, list[int]] = {}
+    for doc_id, page in enumerate(pages):
+        for term, score in page['terms'].items():
+            postings.setdefault(term, []).extend((doc_id, score))
+    terms = sorted(postings)
+    return {
+        'docs': [[page['url'], page['title'], page['parent']] for page in pages],
+        'terms': terms,
+        'postings': [postings[term] for term in terms],
+    }
+
+
+def shard_file_name(shard: str) -> str:
+    # Назви розділів кирилицею; хеш дає стабільне ASCII-ім'я файлу
+    return f"shard-{hashlib.sha1(shard.encode('utf-8')).hexdigest()[:10]}.json"
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    """Записує файл лише тоді, коли вміст змінився (щоб інкрементальна збірка Jekyll не бачила зайвих змін)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    write_file_atomic(path, content)
+    return True
+
+
+def build_search_index(root: str = '.', output_dir: str = DEFAULT_OUTPUT_DIR,
+                       config_path: str = CONFIG_FILE) -> list[str]:
+    """Будує шарди і маніфест у output_dir. Повертає шляхи змінених файлів."""
+    config = load_site_config(config_path)
+    separator_source = separator_pattern(config)
+    separator = re.compile(separator_source)
+    shards = collect_pages(root, config, separator)
+    os.makedirs(output_dir, exist_ok=True)
+
+    changed = []
+    manifest_shards = []
+    file_names = set()
+    for shard, pages in sorted(shards.items()):
+        index = build_shard(pages)
+        file_name = shard_file_name(shard)
+        file_names.add(file_name)
+        content = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+        path = os.path.join(output_dir, file_name)
+        if _write_if_changed(path, content):
+            changed.append(path)
+        bits, bloom = build_bloom(index['terms'])
+        section_title = next((page['title'] for page in pages if page['is_section']), shard)
+        manifest_shards.append({
+            'name': shard, 'title': section_title, 'file': file_name,
+            'docs': len(pages), 'bytes': len(content.encode('utf-8')), 'bits': bits, 'bloom': bloom,
+        })
+
+    manifest = {
+        'separator': separator_source,
+        'prefix_chars': BLOOM_PREFIX_CHARS,
+        'hashes': BLOOM_HASHES,
+        'shards': manifest_shards,
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if _write_if_changed(manifest_path, json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))):
+        changed.append(manifest_path)
+
+    # Шарди розділів, яких уже немає
+    for name in os.listdir(output_dir):
+        if name.startswith('shard-') and name.endswith('.json') and name not in file_names:
+            os.remove(os.path.join(output_dir, name))
+            changed.append(os.path.join(output_dir, name))
+    return changed
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Побудова пошукового індексу сайту, розбитого на шарди за розділами.")
+    parser.add_argument("--root", default='.', help="Корінь дерева документації (за замовчуванням поточний каталог).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR,
+                        help=f"Каталог для шардів і маніфесту (за замовчуванням '{DEFAULT_OUTPUT_DIR}').")
+    parser.add_argument("--config", default=CONFIG_FILE, help=f"Конфігурація Jekyll (за замовчуванням '{CONFIG_FILE}').")
+    args = parser.parse_args(argv)
+
+    changed = build_search_index(args.root, args.output, args.config)
+    with open(os.path.join(args.output, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        shards = json.load(f)['shards']
+    total_bytes = sum(shard['bytes'] for shard in shards)
+    largest = max((shard['bytes'] for shard in shards), default=0)
+    print(f"--- Пошуковий індекс: сторінок {sum(shard['docs'] for shard in shards)}, шардів {len(shards)}, "
+          f"{total_bytes / 1024:.1f} КБ (найбільший шард {largest / 1024:.1f} КБ), змінено файлів: {len(changed)} ---")
+
+
+if __name__ == "__main__":
+    main()
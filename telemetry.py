@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+import time
+from markdown_files import write_file_atomic
+
+DEFAULT_TELEMETRY_DIR = "telemetry"
+TRACE_FILE_NAME = "trace.jsonl"
+PROMETHEUS_FILE_NAME = "metrics.prom"
+METRIC_PREFIX = "jv_docs"
+
+
+class _TypeStats:
+    """Накопичені метрики викликів API для одного типу промпту."""
+
+    def __init__(self):
+        self.outcomes: dict[str, int] = {}
+        self.seconds = 0.0
+        self.latencies: list[float] = []
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.retries = 0
+
+
+class Telemetry:
+    """
+    Збирає структуровані метрики запуску: кожен виклик API (час, токени з usage_metadata,
+    тип промпту, повтори, результат) і стан черги (глибина, оброблені файли).
+    Події дописуються в JSONL-трасу; в кінці запуску формуються Prometheus textfile і підсумкова таблиця.
+    Запис однієї події - це одне доповнення рядка в буферизований файл під блокуванням.
+    """
+
+    def __init__(self, output_dir: str | None = DEFAULT_TELEMETRY_DIR):
+        self.output_dir = output_dir
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._by_type: dict[str, _TypeStats] = {}
+        self._queue_depth = 0
+        self._pages = {"done": 0, "failed": 0}
+        self._trace = None
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            self._trace = open(os.path.join(output_dir, TRACE_FILE_NAME), 'a', encoding='utf-8')
+
+    def _write_event(self, event: dict):
+        if self._trace:
+            self._trace.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def record_call(self, prompt_type: str, wall_seconds: float, outcome: str,
+                    prompt_tokens: int = 0, response_tokens: int = 0, retries: int = 0, shard: str = ""):
+        """Фіксує один виклик generate_conspectus. outcome: ok, cached, empty або error; shard - мітка шарду API."""
+        prompt_type = prompt_type or "unknown"
+        with self._lock:
+            stats = self._by_type.setdefault(prompt_type, _TypeStats())
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+            stats.seconds += wall_seconds
+            stats.latencies.append(wall_seconds)
+            stats.prompt_tokens += prompt_tokens
+            stats.response_tokens += response_tokens
+            stats.retries += retries
+            self._write_event({
+                "event": "call", "ts": round(time.time(), 3), "prompt_type": prompt_type,
+                "wall_seconds": round(wall_seconds, 4), "prompt_tokens": prompt_tokens,
+                "response_tokens": response_tokens, "retries": retries, "outcome": outcome, "shard": shard,
+            })
+
+    def record_page(self, path: str, is_successful: bool, queue_depth: int):
+        """Фіксує завершення обробки файлу черги та поточну глибину черги."""
+        with self._lock:
+            self._pages["done" if is_successful else "failed"] += 1
+            self._queue_depth = queue_depth
+            processed = self._pages["done"] + self._pages["failed"]
+            elapsed = max(time.time() - self.started_at, 1e-9)
+            self._write_event({
+                "event": "page", "ts": round(time.time(), 3), "path": path,
+                "outcome": "done" if is_successful else "failed", "queue_depth": queue_depth,
+                "processed": processed, "pages_per_minute": round(processed / elapsed * 60, 2),
+            })
+
+    def summary_table(self) -> str:
+        """Підсумкова таблиця за типами промптів."""
+        with self._lock:
+            header = f"{'тип':<10} {'викликів':>9} {'кеш':>5} {'помилок':>8} {'повторів':>9} {'p50, с':>7} {'p95, с':>7} {'токени вх.':>11} {'токени вих.':>12}"
+            rows = [header, "-" * len(header)]
+            for prompt_type, stats in sorted(self._by_type.items()):
+                calls = sum(stats.outcomes.values())
+                errors = stats.outcomes.get("error", 0) + stats.outcomes.get("empty", 0)
+                latencies = sorted(stats.latencies)
+                p50 = latencies[int(0.50 * (len(latencies) - 1))] if latencies else 0.0
+                p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+                rows.append(f"{prompt_type:<10} {calls:>9} {stats.outcomes.get('cached', 0):>5} {errors:>8} "
+                            f"{stats.retries:>9} {p50:>7.2f} {p95:>7.2f} {stats.prompt_tokens:>11} {stats.response_tokens:>12}")
+            elapsed = time.time() - self.started_at
+            processed = self._pages["done"] + self._pages["failed"]
+            rows.append("-" * len(header))
+            rows.append(f"Сторінок: {self._pages['done']} успішно, {self._pages['failed']} з помилками "
+                        f"за {elapsed:.1f} с ({processed / max(elapsed, 1e-9) * 60:.1f} сторінок/хв).")
+            return "\n".join(rows)
+
+    def prometheus_text(self) -> str:
+        """Метрики у текстовому форматі Prometheus (для node_exporter textfile collector)."""
+        p = METRIC_PREFIX
+        lines = []
+        with self._lock:
+            lines += [f"# HELP {p}_api_calls_total Виклики Gemini API за типом промпту та результатом.",
+                      f"# TYPE {p}_api_calls_total counter"]
+            for prompt_type, stats in sorted(self._by_type.items()):
+                for outcome, count in sorted(stats.outcomes.items()):
+                    lines.append(f'{p}_api_calls_total{{prompt_type="{prompt_type}",outcome="{outcome}"}} {count}')
+            lines += [f"# HELP {p}_api_call_seconds Сумарний час викликів API.",
+                      f"# TYPE {p}_api_call_seconds summary"]
+            for prompt_type, stats in sorted(self._by_type.items()):
+                lines.append(f'{p}_api_call_seconds_sum{{prompt_type="{prompt_type}"}} {stats.seconds:.6f}')
+                lines.append(f'{p}_api_call_seconds_count{{prompt_type="{prompt_type}"}} {len(stats.latencies)}')
+            lines += [f"# HELP {p}_api_tokens_total Токени з usage_metadata.",
+                      f"# TYPE {p}_api_tokens_total counter"]
+            for prompt_type, stats in sorted(self._by_type.items()):
+                lines.append(f'{p}_api_tokens_total{{prompt_type="{prompt_type}",kind="prompt"}} {stats.prompt_tokens}')
+                lines.append(f'{p}_api_tokens_total{{prompt_type="{prompt_type}",kind="response"}} {stats.response_tokens}')
+            lines += [f"# HELP {p}_api_retries_total Повторні спроби викликів API.",
+                      f"# TYPE {p}_api_retries_total counter"]
+            for prompt_type, stats in sorted(self._by_type.items()):
+                lines.append(f'{p}_api_retries_total{{prompt_type="{prompt_type}"}} {stats.retries}')
+            lines += [f"# HELP {p}_pages_processed_total Оброблені файли черги.",
+                      f"# TYPE {p}_pages_processed_total counter"]
+            for outcome, count in self._pages.items():
+                lines.append(f'{p}_pages_processed_total{{outcome="{outcome}"}} {count}')
+            lines += [f"# HELP {p}_queue_depth Файли, що очікують обробки.",
+                      f"# TYPE {p}_queue_depth gauge",
+                      f"{p}_queue_depth {self._queue_depth}",
+                      f"# HELP {p}_run_started_seconds Час початку запуску (Unix).",
+                      f"# TYPE {p}_run_started_seconds gauge",
+                      f"{p}_run_started_seconds {self.started_at:.3f}"]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Закриває трасу та атомарно записує Prometheus textfile."""
+        with self._lock:
+            if self._trace:
+                self._trace.close()
+                self._trace = None
+        if self.output_dir:
+            path = os.path.join(self.output_dir, PROMETHEUS_FILE_NAME)
+            write_file_atomic(path, self.prometheus_text())
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from llm_backends import BackendUnavailable, LocalProvider, Shard, ShardedBackend
+from retry_policy import classify_error
+
+
+class ApiError(Exception):
+    """Виняток із кодом статусу, як у google.api_core."""
+
+    def __init__(self, code, message=""):
+        super().__init__(message)
+        self.code = code
+
+
+class FailingProvider(LocalProvider):
+    """Локальний провайдер, що відповідає помилкою API для вибраних ключів."""
+
+    def __init__(self, failures: dict[str, Exception]):
+        super().__init__(response_chars=100)
+        self.failures = failures
+        self.keys = []
+
+    def before_request(self, api_key: str) -> float:
+        self.keys.append(api_key)
+        if api_key in self.failures:
+            raise self.failures[api_key]
+        return 0.0
+
+
+def make_backend(provider: LocalProvider, keys: list[str]) -> ShardedBackend:
+    return ShardedBackend([Shard(provider, key, "local-model") for key in keys])
+
+
+def call(backend: ShardedBackend) -> Shard:
+    """Один запит через бекенд, як у gemini_service: помилка передається в report_failure."""
+    shard = backend.acquire()
+    try:
+        backend.model(shard, "system").generate_content("prompt")
+    except ApiError as e:
+        backend.report_failure(shard, classify_error(e))
+    else:
+        backend.report_success(shard)
+    return shard
+
+
+def test_acquire_rotates_over_shards():
+    provider = FailingProvider({})
+    backend = make_backend(provider, ["key-a", "key-b", "key-c"])
+    for _ in range(6):
+        call(backend)
+    assert provider.keys == ["key-a", "key-b", "key-c"] * 2
+    assert [shard.calls for shard in backend.shards] == [2, 2, 2]
+
+
+def test_rate_limit_cools_down_shard_for_retry_after():
+    provider = FailingProvider({"key-a": ApiError(429, "Quota exceeded. Please retry in 60s")})
+    backend = make_backend(provider, ["key-a", "key-b"])
+    before = time.monotonic()
+    assert call(backend).api_key == "key-a"
+    limited = backend.shards[0]
+    assert 59 <= limited.available_at - before <= 61
+    assert limited.disabled_reason is None
+    # Поки шард охолоджується, запити йдуть лише на інший
+    assert [call(backend).api_key for _ in range(3)] == ["key-b"] * 3
+
+
+def test_rate_limit_cooldown_is_capped():
+    provider = FailingProvider({"key-a": ApiError(429, "retry_delay { seconds: 3600 }")})
+    backend = ShardedBackend([Shard(provider, "key-a", "m"), Shard(provider, "key-b", "m")], max_cooldown=120)
+    before = time.monotonic()
+    call(backend)
+    assert backend.shards[0].available_at - before <= 121
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_auth_error_disables_shard(status):
+    provider = FailingProvider({"key-a": ApiError(status, "API key not valid")})
+    backend = make_backend(provider, ["key-a", "key-b"])
+    shard = backend.acquire()
+    with pytest.raises(ApiError) as error:
+        backend.model(shard, "system").generate_content("prompt")
+    # Інший шард готовий, тож повторювати можна одразу
+    assert backend.report_failure(shard, classify_error(error.value))
+    assert shard.disabled_reason == f"HTTP {status}"
+    assert [call(backend).api_key for _ in range(3)] == ["key-b"] * 3
+
+
+def test_all_shards_disabled_raises_backend_unavailable():
+    provider = FailingProvider({"key-a": ApiError(401), "key-b": ApiError(403)})
+    backend = make_backend(provider, ["key-a", "key-b"])
+    call(backend)
+    call(backend)
+    with pytest.raises(BackendUnavailable, match="HTTP 401.*HTTP 403"):
+        backend.acquire()
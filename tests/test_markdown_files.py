@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+import pytest
+
+from markdown_files import write_file_atomic
+
+
+def test_write_file_atomic_replaces_content_and_keeps_mode(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text("old", encoding="utf-8")
+    os.chmod(path, 0o644)
+    write_file_atomic(str(path), "новий вміст")
+    assert path.read_text(encoding="utf-8") == "новий вміст"
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    assert os.listdir(tmp_path) == ["index.json"]
+
+
+def test_write_file_atomic_uses_unique_temp_names(tmp_path, monkeypatch):
+    names = []
+    mkstemp = tempfile.mkstemp
+
+    def recording_mkstemp(*args, **kwargs):
+        fd, name = mkstemp(*args, **kwargs)
+        names.append(name)
+        return fd, name
+
+    monkeypatch.setattr(tempfile, "mkstemp", recording_mkstemp)
+    path = str(tmp_path / "manifest.json")
+    write_file_atomic(path, "1")
+    write_file_atomic(path, "2")
+    assert len(set(names)) == 2
+    assert all(os.path.dirname(name) == str(tmp_path) for name in names)
+
+
+def test_write_file_atomic_leaves_target_on_failure(tmp_path):
+    path = tmp_path / "page.md"
+    path.write_text("old", encoding="utf-8")
+    with pytest.raises(UnicodeEncodeError):
+        write_file_atomic(str(path), "\ud800")
+    assert path.read_text(encoding="utf-8") == "old"
+    assert os.listdir(tmp_path) == ["page.md"]
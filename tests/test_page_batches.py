@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import json
+
+from page_batches import BATCH_ITEM_RE, build_batch_prompt, group_batches, parse_batch_response
+
+
+def test_parse_plain_and_fenced_json():
+    payload = {"1.1": "Текст 1.1", "1.2.": " Текст 1.2 "}
+    assert parse_batch_response(json.dumps(payload), ["1.1", "1.2"]) == {"1.1": "Текст 1.1", "1.2": "Текст 1.2"}
+    fenced = f"```json\n{json.dumps(payload)}\n```"
+    assert parse_batch_response(fenced, ["1.1"]) == {"1.1": "Текст 1.1"}
+
+
+def test_parse_skips_unexpected_empty_and_non_text_items():
+    payload = {"1.1": "", "1.2": ["список"], "1.3": "Текст", "9.9": "Чужий номер"}
+    assert parse_batch_response(json.dumps(payload), ["1.1", "1.2", "1.3"]) == {"1.3": "Текст"}
+
+
+def test_parse_invalid_response():
+    assert parse_batch_response("Ось ваші сторінки: ...", ["1.1"]) == {}
+    assert parse_batch_response('["1.1"]', ["1.1"]) == {}
+    assert parse_batch_response('{"1.1": "обрізан', ["1.1"]) == {}
+
+
+def test_build_prompt_headers_match_item_pattern():
+    prompt = build_batch_prompt([("1.1", "Промпт 1"), ("1.2", "Промпт 2")])
+    assert BATCH_ITEM_RE.findall(prompt) == ["1.1", "1.2"]
+
+
+def test_group_siblings_by_type_and_section():
+    paths = [
+        "a/s1/t1/index.md", "a/s1/t2/index.md", "a/s1/t3/index.md",
+        "a/s1/t1/qa.md",
+        "a/s2/t1/index.md",
+        "a/s1/index.md",
+    ]
+    types = {path: "faq" if path.endswith("qa.md") else "topic" for path in paths}
+    types["a/s1/index.md"] = "overview"
+    assert group_batches(paths, types, 2) == [
+        ["a/s1/t1/index.md", "a/s1/t2/index.md"],
+        ["a/s1/t3/index.md"],
+        ["a/s1/t1/qa.md"],
+        ["a/s2/t1/index.md"],
+        ["a/s1/index.md"],
+    ]
+
+
+def test_group_without_batching():
+    paths = ["a/s1/t1/index.md", "a/s1/t2/index.md"]
+    types = {path: "topic" for path in paths}
+    assert group_batches(paths, types, 1) == [[path] for path in paths]
+    assert group_batches(paths, {}, 4) == [[path] for path in paths]
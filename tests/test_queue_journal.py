@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from queue_journal import QueueJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = QueueJournal(str(tmp_path / "queue.sqlite3"))
+    yield journal
+    journal.close()
+
+
+def test_dequeue_in_order_without_duplicates(journal):
+    assert journal.enqueue(["/a/index.md", "b/index.md", "a/index.md", ""]) == 2
+    assert journal.remaining() == 2
+    assert journal.dequeue() == "a/index.md"
+    assert journal.dequeue() == "b/index.md"
+    assert journal.dequeue() is None
+    # Файли в обробці теж рахуються, доки їх не завершено
+    assert journal.remaining() == 2
+
+
+def test_ack_and_fail_update_remaining(journal):
+    journal.enqueue(["a.md", "b.md", "c.md"])
+    journal.ack(journal.dequeue())
+    journal.fail(journal.dequeue(), "HTTP 500")
+    assert journal.remaining() == 1
+    assert journal.counts() == {"pending": 1, "in_flight": 0, "done": 1, "failed": 1}
+    assert journal.failures() == [("b.md", 1, "HTTP 500")]
+    # Повторне завершення вже завершеного файлу лічильник не змінює
+    journal.ack("a.md")
+    assert journal.remaining() == 1
+
+
+def test_done_and_failed_items_are_requeued(journal):
+    journal.enqueue(["a.md", "b.md"])
+    journal.ack(journal.dequeue())
+    journal.fail(journal.dequeue(), "error")
+    assert journal.remaining() == 0
+
+    assert journal.enqueue(["a.md"]) == 1
+    assert journal.requeue_failed() == 1
+    assert journal.remaining() == 2
+    assert journal.pending_paths() == ["a.md", "b.md"]
+    assert journal.failures() == []
+
+
+def test_recover_returns_interrupted_items(tmp_path):
+    db_path = str(tmp_path / "queue.sqlite3")
+    journal = QueueJournal(db_path)
+    journal.enqueue(["a.md", "b.md", "c.md"])
+    journal.dequeue()
+    assert journal.claim("c.md")
+    journal.close()
+
+    # Новий запуск після збою: лічильник відновлюється з бази
+    journal = QueueJournal(db_path)
+    assert journal.remaining() == 3
+    assert journal.recover() == 2
+    assert journal.counts()["in_flight"] == 0
+    assert journal.pending_paths() == ["a.md", "b.md", "c.md"]
+    assert journal.dequeue() == "a.md"
+    journal.close()
+
+
+def test_claim_only_pending(journal):
+    journal.enqueue(["a.md"])
+    assert journal.claim("/a.md")
+    assert not journal.claim("a.md")
+    assert not journal.claim("missing.md")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import retry_policy
+from retry_policy import AdaptiveConcurrency, RetryPolicy, classify_error
+
+
+class ApiError(Exception):
+    """Виняток із кодом статусу, як у google.api_core."""
+
+    def __init__(self, code, message=""):
+        super().__init__(message)
+        self.code = code
+
+
+def test_classify_status_from_code_and_message():
+    assert classify_error(ApiError(503)).retryable
+    assert classify_error(ApiError(429)).is_rate_limit
+    assert not classify_error(ApiError(403)).retryable
+    info = classify_error(Exception("500 Internal error"))
+    assert (info.retryable, info.status) == (True, 500)
+    assert not classify_error(Exception("400 Invalid argument")).retryable
+
+
+def test_classify_retry_after_hints():
+    assert classify_error(Exception("429 Quota exceeded. retry_delay { seconds: 27 }")).retry_after == 27
+    assert classify_error(Exception("429 Resource exhausted. Please retry in 3.5s.")).retry_after == 3.5
+    assert classify_error(Exception("429 Resource exhausted")).retry_after is None
+
+
+def test_classify_network_and_unknown_errors():
+    assert classify_error(TimeoutError("timed out")).retryable
+    assert classify_error(ConnectionResetError()).retryable
+    info = classify_error(ValueError("response blocked"))
+    assert not info.retryable and info.status is None
+
+
+def test_delay_is_capped_and_prefers_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    for attempt in range(1, 8):
+        assert 0 <= policy.delay(attempt, classify_error(ApiError(500))) <= 10.0
+    delay = policy.delay(1, classify_error(Exception("429 Please retry in 4s")))
+    assert 4.0 <= delay <= 5.0
+
+
+def test_throttle_halves_limit_once_per_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry_policy.time, "monotonic", lambda: now[0])
+    concurrency = AdaptiveConcurrency(8, cooldown=5.0)
+
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+    # Та сама хвиля 429 не зменшує ліміт повторно
+    now[0] += 1.0
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+    now[0] += 5.0
+    concurrency.on_throttle()
+    assert concurrency.limit == 2
+    for _ in range(5):
+        now[0] += 10.0
+        concurrency.on_throttle()
+    assert concurrency.limit == 1
+
+
+def test_success_grows_limit_up_to_max():
+    concurrency = AdaptiveConcurrency(4, cooldown=0.0)
+    concurrency.on_throttle()
+    assert concurrency.limit == 2
+    # Приблизно +1 за "раунд" із ліміт успішних запитів
+    concurrency.on_success()
+    concurrency.on_success()
+    assert int(concurrency.limit) == 2
+    concurrency.on_success()
+    assert int(concurrency.limit) == 3
+    for _ in range(100):
+        concurrency.on_success()
+    assert concurrency.limit == 4
+
+
+def test_acquire_respects_limit():
+    concurrency = AdaptiveConcurrency(2)
+    concurrency.on_throttle()
+    concurrency.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (concurrency.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.2)
+    concurrency.release()
+    assert acquired.wait(1.0)
+    waiter.join()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import os
+
+from markdown_files import get_file_data
+from script_create_structure import PLACEHOLDER_TEXT, STRUCTURE_MANIFEST_FILE, sync_structure
+
+
+def outline(*lines):
+    return [f"{line}\n" for line in lines]
+
+
+def page_dirs(root):
+    """Каталоги зі сторінками index.md відносно root."""
+    result = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        if 'index.md' in filenames and os.path.normpath(dirpath) != os.path.normpath(root):
+            result.add(os.path.relpath(dirpath, root))
+    return result
+
+
+def find_dir(root, title):
+    """Каталог, сторінка якого має заданий заголовок."""
+    for relative in page_dirs(root):
+        front_matter, _ = get_file_data(os.path.join(root, relative, 'index.md'))
+        if front_matter.get('title') == title:
+            return relative
+    raise AssertionError(f"Сторінку '{title}' не знайдено")
+
+
+def generate(root, relative, text):
+    """Імітує generate_content.py: замінює заглушку згенерованим текстом, Front Matter лишає як є."""
+    path = os.path.join(root, relative, 'index.md')
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    assert PLACEHOLDER_TEXT in content
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content.replace(PLACEHOLDER_TEXT, text))
+
+
+def body(root, relative):
+    _, page_body = get_file_data(os.path.join(root, relative, 'index.md'))
+    return page_body
+
+
+def test_rename_keeps_generated_content(tmp_path):
+    root = str(tmp_path)
+    sync_structure(outline("1 1 Java", "1.1 1.1 Змінні"), root)
+    variables = find_dir(root, "1.1 Змінні")
+    generate(root, variables, "Текст про змінні")
+
+    sync_structure(outline("1 1 Java", "1.1 1.1 Змінні та типи"), root)
+
+    renamed = find_dir(root, "1.1 Змінні та типи")
+    assert renamed != variables
+    assert not os.path.exists(os.path.join(root, variables))
+    assert "Текст про змінні" in body(root, renamed)
+
+
+def test_move_to_other_section_keeps_generated_content(tmp_path):
+    root = str(tmp_path)
+    sync_structure(outline("1 1 Java", "1.1 1.1 Колекції", "2 2 Kotlin"), root)
+    collections = find_dir(root, "1.1 Колекції")
+    generate(root, collections, "Текст про колекції")
+
+    sync_structure(outline("1 1 Java", "2 2 Kotlin", "2.1 2.1 Колекції"), root)
+
+    moved = find_dir(root, "2.1 Колекції")
+    assert moved.startswith(find_dir(root, "2 Kotlin") + os.sep)
+    assert "Текст про колекції" in body(root, moved)
+    front_matter, _ = get_file_data(os.path.join(root, moved, 'index.md'))
+    assert front_matter['parent'] == "2 Kotlin"
+
+
+def test_insert_before_section_with_repeated_child_title(tmp_path):
+    root = str(tmp_path)
+    sync_structure(outline("1 1 Java", "1.1 1.1 Вступ", "2 2 Spring", "2.1 2.1 Вступ"), root)
+    generate(root, find_dir(root, "1.1 Вступ"), "Вступ до Java")
+    generate(root, find_dir(root, "2.1 Вступ"), "Вступ до Spring")
+
+    sync_structure(outline("1 1 Java", "1.1 1.1 Вступ", "2 2 Kotlin", "2.1 2.1 Вступ",
+                           "3 3 Spring", "3.1 3.1 Вступ"), root)
+
+    spring_intro = find_dir(root, "3.1 Вступ")
+    kotlin_intro = find_dir(root, "2.1 Вступ")
+    assert spring_intro.startswith(find_dir(root, "3 Spring") + os.sep)
+    assert "Вступ до Spring" in body(root, spring_intro)
+    assert PLACEHOLDER_TEXT in body(root, kotlin_intro)
+    assert "Вступ до Java" in body(root, find_dir(root, "1.1 Вступ"))
+
+
+def write_hand_page(root):
+    os.makedirs(os.path.join(root, 'about'))
+    with open(os.path.join(root, 'about', 'index.md'), 'w', encoding='utf-8') as f:
+        f.write("---\ntitle: Про проєкт\nparent: Home\n---\n\nНаписано вручну.\n")
+
+
+def test_hand_written_page_is_not_removed_without_manifest(tmp_path, capsys):
+    root = str(tmp_path)
+    write_hand_page(root)
+
+    sync_structure(outline("1 1 Java"), root, dry_run=True)
+    assert "about" not in capsys.readouterr().out
+    sync_structure(outline("1 1 Java"), root)
+
+    assert os.path.exists(os.path.join(root, 'about', 'index.md'))
+    assert os.path.exists(os.path.join(root, STRUCTURE_MANIFEST_FILE))
+
+
+def test_hand_written_page_is_not_removed_with_manifest(tmp_path):
+    root = str(tmp_path)
+    sync_structure(outline("1 1 Java", "2 2 Kotlin"), root)
+    write_hand_page(root)
+    kotlin = find_dir(root, "2 Kotlin")
+    os.makedirs(os.path.join(root, kotlin, 'notes'))
+    with open(os.path.join(root, kotlin, 'notes', 'index.md'), 'w', encoding='utf-8') as f:
+        f.write("---\ntitle: Нотатки\nparent: 2 Kotlin\n---\n\nНаписано вручну.\n")
+
+    sync_structure(outline("1 1 Java"), root)
+
+    assert os.path.exists(os.path.join(root, 'about', 'index.md'))
+    # Розділ, якого вже немає в структурі, не видаляється разом зі сторінкою, написаною вручну
+    assert os.path.exists(os.path.join(root, kotlin, 'notes', 'index.md'))
+
+
+def test_removed_section_is_deleted(tmp_path):
+    root = str(tmp_path)
+    sync_structure(outline("1 1 Java", "2 2 Kotlin", "2.1 2.1 Корутини"), root)
+    kotlin = find_dir(root, "2 Kotlin")
+
+    sync_structure(outline("1 1 Java"), root)
+
+    assert not os.path.exists(os.path.join(root, kotlin))
+    assert page_dirs(root) == {find_dir(root, "1 Java")}